@@ -1,6 +1,13 @@
 import os
+import math
+import hashlib
+import numpy as np
 import openpyxl
 
+CELL_SIZE = 10                      # edge length of a cell of the Excel sheet in the world
+WORLD_SIZE = 600                    # 60x60 cells
+MIN_DISTANCE = 15                   # distance of the avoiding WPs to the obstacle corners (MIN_DISTANCE of the rovers)
+
 def read_excel(filename):
     # Ermittle den vollständigen Dateipfad zur Excel-Datei
     full_path = os.path.join(os.path.dirname(__file__), filename)
@@ -25,18 +32,97 @@ def read_excel(filename):
 
     return black_cells
 
+def merge_cells(black_cells, cell_size=CELL_SIZE):
+    """
+    Merges adjacent black cells into axis-aligned rectangles: horizontal runs of cells per row, runs with the same
+    columns in consecutive rows are merged into one rectangle (near-minimal number of rectangles).
+    :return: list of rectangles in the format of the cells [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+    """
+    cells = set()
+    for cell in black_cells:
+        cells.add((min(x for x, y in cell) // cell_size, min(y for x, y in cell) // cell_size))
+
+    rectangles = []
+    open_runs = {}                  # (first column, last column + 1) -> first row of the rectangle
+    rows = sorted({row for column, row in cells})
+    previous_row = None
+    for row in rows + [None]:
+        runs = set()
+        if row is not None:
+            columns = sorted(column for column, cell_row in cells if cell_row == row)
+            start = columns[0]
+            for column, next_column in zip(columns, columns[1:] + [None]):
+                if next_column != column + 1:
+                    runs.add((start, column + 1))
+                    start = next_column
+        # runs which are not continued in this row (or rows with a gap) are finished rectangles
+        for run in list(open_runs):
+            if run not in runs or row != previous_row + 1:
+                first_row = open_runs.pop(run)
+                rectangles.append((run[0], first_row, run[1], previous_row + 1))
+        for run in runs:
+            open_runs.setdefault(run, row)
+        previous_row = row
+
+    rectangles.sort(key=lambda rectangle: (rectangle[1], rectangle[0]))
+    return [[(x0*cell_size, y0*cell_size), (x1*cell_size, y0*cell_size), (x1*cell_size, y1*cell_size), (x0*cell_size, y1*cell_size)]
+            for x0, y0, x1, y1 in rectangles]
+
+def avoiding_waypoints(obstacles, min_distance=MIN_DISTANCE, world_size=WORLD_SIZE):
+    """
+    Avoiding WPs of the navigation (on the bisector of every corner of the axis-aligned obstacles) which are inside the
+    world and not inside an obstacle.
+    """
+    offset = min_distance / math.sqrt(2)
+    boxes = [(min(x for x, y in obstacle), min(y for x, y in obstacle), max(x for x, y in obstacle), max(y for x, y in obstacle)) for obstacle in obstacles]
+    waypoints = []
+    for x0, y0, x1, y1 in boxes:
+        for x, y in ((x0 - offset, y0 - offset), (x1 + offset, y0 - offset), (x1 + offset, y1 + offset), (x0 - offset, y1 + offset)):
+            if 0 <= x <= world_size and 0 <= y <= world_size and not any(bx0 < x < bx1 and by0 < y < by1 for bx0, by0, bx1, by1 in boxes):
+                waypoints.append((x, y))
+    return waypoints
+
+def compaction_report(cells, rectangles):
+    """
+    Prints the number of obstacles, vertices and avoiding WPs of the per-cell map and the merged map.
+    """
+    print(f"{'mode':<12}{'obstacles':>12}{'vertices':>12}{'avoiding WPs':>14}")
+    for mode, obstacles in (("cells", cells), ("rectangles", rectangles)):
+        print(f"{mode:<12}{len(obstacles):>12}{sum(len(obstacle) for obstacle in obstacles):>12}{len(avoiding_waypoints(obstacles)):>14}")
+
+def source_hash(literal):
+    # SHA-256 des Python-Literals (Zeilenenden vereinheitlicht), erkennt in der Simulation eine veraltete Binärkarte
+    return hashlib.sha256(literal.replace('\r\n', '\n').encode()).hexdigest()
+
 def write_output(output_filename, black_cells):
     # Ermittle den vollständigen Dateipfad zur Ausgabedatei
     full_output_path = os.path.join(os.path.dirname(__file__), output_filename)
+    literal = 'OBSTACLES = ' + str(black_cells)
+
+    # Binäres Kartenformat (simulation/world/obstacle_map.py): Eckpunkte aller Hindernisse, Offsets, Bounding Boxes
+    # und der Hash des zugehörigen Literals (obstacles.py)
+    if output_filename.endswith('.npz'):
+        vertices = np.array([corner for cell in black_cells for corner in cell]).reshape(-1, 2)
+        offsets = np.cumsum([0] + [len(cell) for cell in black_cells])
+        bounds = np.array([(*vertices[start:end].min(axis=0), *vertices[start:end].max(axis=0))
+                           for start, end in zip(offsets[:-1], offsets[1:])], dtype=vertices.dtype).reshape(-1, 4)
+        np.savez(full_output_path, vertices=vertices, offsets=offsets, bounds=bounds, source_hash=np.array(source_hash(literal)))
+        return
 
     # Schreibe die schwarzen Zellen in die Ausgabedatei
     with open(full_output_path, 'w') as f:
-        f.write('OBSTACLES = ' + str(black_cells))
+        f.write(literal)
 
 # Hauptprogramm
 if __name__ == "__main__":
     excel_filename = 'map.xlsx'  # Passe den Dateinamen an
     output_filename = 'obstacles.py'  # Passe den Ausgabedateinamen an
+    binary_output_filename = 'obstacles.npz'  # Binäres Kartenformat, wird von der Simulation bevorzugt geladen
+    mode = 'rectangles'  # 'rectangles': benachbarte Zellen zu Rechtecken zusammengefasst, 'cells': ein Hindernis pro schwarzer Zelle (Original)
 
     black_cells = read_excel(excel_filename)
-    write_output(output_filename, black_cells)
\ No newline at end of file
+    rectangles = merge_cells(black_cells)
+    compaction_report(black_cells, rectangles)
+    obstacles = rectangles if mode == 'rectangles' else black_cells
+    write_output(output_filename, obstacles)
+    write_output(binary_output_filename, obstacles)
\ No newline at end of file
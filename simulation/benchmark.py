@@ -0,0 +1,214 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import sys
+import json
+import time
+import random
+import timeit
+import argparse
+import platform
+from constants import *
+from world.obstacle_map import OBSTACLES
+from world.start_positions import START_POSITIONS
+from vehicle.navigation import a_star, lazy_a_star, perform_navigation
+from vehicle.world_model import WorldModel, world_model_update, merge, obstacle_in_world_model
+from vehicle.visibility_graph import VisibilityGraph
+from vehicle.occupancy_grid import OccupancyGrid
+from vehicle.scheduler import EventScheduler
+from vehicle.communication import plan_aware_comm, utility_aware_comm, receiver_aware_comm, integrated_comm, full_comm
+from vehicle.rover.rover import Rover, MIN_DISTANCE, MAX_MEMORY_COMM_CANDIDATES
+from vehicle.team_state import TeamState
+from main import run_cycle
+
+
+'''
+Benchmark suite for the hot paths of the simulation.
+Every benchmark measures the time per call of one function (best of REPEAT repetitions). The results are saved as JSON,
+the compare mode flags every benchmark which is slower than in a stored baseline by more than the tolerance.
+
+    python simulation/benchmark.py --output benchmark.json
+    python simulation/benchmark.py --output new.json --compare benchmark.json
+'''
+
+REPEAT = 3                                  # repetitions per benchmark, the best one is reported
+WORLD_MODEL_SIZES = [10, 25, 50, 100]       # number of obstacles in the world model for navigation benchmarks
+TEAM_SIZES = [2, 10, 50, 200]               # number of rovers for communication benchmarks
+NAVIGATION_STARTS = 5                       # start positions (farthest from the target) per navigation benchmark call
+REGRESSION_TOLERANCE = 0.2                  # relative slow down that is flagged as regression
+STRATEGIES = {"PlaCom": plan_aware_comm, "UtiCom": utility_aware_comm, "RecCom": receiver_aware_comm, "IntCom": integrated_comm, "FulCom": full_comm}
+
+
+def sample_world_model(number_of_obstacles, seed=0, grid=None, world_model=None):
+    """
+    World model built from randomly chosen obstacles of the map (with merged overlapping obstacles).
+    :param grid: OccupancyGrid which is filled alongside the world model.
+    :param world_model: empty world model to fill (WorldModel), a list if None.
+    """
+    rng = random.Random(seed)
+    world_model = [] if world_model is None else world_model
+    for obstacle in rng.sample(OBSTACLES, min(number_of_obstacles, len(OBSTACLES))):
+        world_model_update(obstacle, world_model, grid)
+    return world_model
+
+def create_team(number_of_rovers, comm_type="IntCom", seed=0):
+    """
+    Rovers at random start positions which share one (never executed) event scheduler.
+    """
+    random.seed(seed)
+    start_positions = START_POSITIONS[0]                                    # extended on demand for more than 50 rovers
+    scheduler = EventScheduler()
+    Rover.instantiated_rovers.clear()
+    return [Rover(ID, start_positions[ID], TARGET_COORDINATES, WIDTH, HEIGHT, comm_type, 0, scheduler) for ID in range(1, number_of_rovers + 1)]
+
+
+def navigation_starts(number_of_starts=NAVIGATION_STARTS):
+    """
+    The start positions of the first set which are farthest from the target (non-trivial searches).
+    """
+    start_positions = START_POSITIONS[0]
+    positions = [start_positions[ID] for ID in range(1, len(start_positions) + 1)]
+    positions.sort(key=lambda position: -((position[0] - TARGET_COORDINATES[0]) ** 2 + (position[1] - TARGET_COORDINATES[1]) ** 2))
+    return positions[:number_of_starts]
+
+def navigation_benchmarks():
+    """
+    Every call plans the paths from NAVIGATION_STARTS start positions far from the target.
+    """
+    benchmarks = {}
+    starts = navigation_starts()
+    for size in WORLD_MODEL_SIZES:
+        world_model = sample_world_model(size)
+        graph = VisibilityGraph(WIDTH, HEIGHT, MIN_DISTANCE)
+        graph.sync(world_model)
+        waypoints = list(graph.nodes)
+        benchmarks[f"navigation/a_star/{size}"] = lambda waypoints=waypoints, world_model=world_model: [a_star(start, TARGET_COORDINATES, waypoints, world_model) for start in starts]
+        benchmarks[f"navigation/lazy_a_star/{size}"] = lambda waypoints=waypoints, world_model=world_model: [lazy_a_star(start, TARGET_COORDINATES, waypoints, world_model) for start in starts]
+        benchmarks[f"navigation/perform_navigation/{size}"] = lambda world_model=world_model: [perform_navigation(world_model, *start, TARGET_COORDINATES, WIDTH, HEIGHT, MIN_DISTANCE) for start in starts]
+        benchmarks[f"navigation/perform_navigation_cached/{size}"] = lambda world_model=world_model, graph=graph: [perform_navigation(world_model, *start, TARGET_COORDINATES, WIDTH, HEIGHT, MIN_DISTANCE, graph) for start in starts]
+        benchmarks[f"navigation/perform_navigation_cached_lazy/{size}"] = lambda world_model=world_model, graph=graph: [perform_navigation(world_model, *start, TARGET_COORDINATES, WIDTH, HEIGHT, MIN_DISTANCE, graph, "lazy_a_star") for start in starts]
+    return benchmarks
+
+def world_model_benchmarks():
+    benchmarks = {}
+    for size in WORLD_MODEL_SIZES:
+        world_model = sample_world_model(size)
+        known_obstacle = world_model[-1]
+        unknown_obstacle = next(obstacle for obstacle in OBSTACLES if not obstacle_in_world_model(obstacle, world_model))
+        benchmarks[f"world_model/world_model_update/{size}"] = lambda world_model=world_model, obstacle=unknown_obstacle: world_model_update(obstacle, list(world_model))
+        benchmarks[f"world_model/obstacle_in_world_model_known/{size}"] = lambda world_model=world_model, obstacle=known_obstacle: obstacle_in_world_model(obstacle, world_model)
+        benchmarks[f"world_model/obstacle_in_world_model_unknown/{size}"] = lambda world_model=world_model, obstacle=unknown_obstacle: obstacle_in_world_model(obstacle, world_model)
+        grid = OccupancyGrid(WIDTH, HEIGHT)
+        world_model = sample_world_model(size, grid=grid)
+        known_obstacle = next(obstacle for obstacle in OBSTACLES if grid.contains(obstacle))
+        benchmarks[f"world_model/world_model_update_grid/{size}"] = lambda world_model=world_model, grid=grid, obstacle=unknown_obstacle: world_model_update(obstacle, list(world_model), grid.copy())
+        benchmarks[f"world_model/obstacle_in_world_model_known_grid/{size}"] = lambda world_model=world_model, grid=grid, obstacle=known_obstacle: obstacle_in_world_model(obstacle, world_model, grid)
+        benchmarks[f"world_model/obstacle_in_world_model_unknown_grid/{size}"] = lambda world_model=world_model, grid=grid, obstacle=unknown_obstacle: obstacle_in_world_model(obstacle, world_model, grid)
+        world_model = sample_world_model(size, world_model=WorldModel())
+        known_obstacle = next(obstacle for obstacle in OBSTACLES if world_model.contains(obstacle))
+        unknown_obstacle = next(obstacle for obstacle in OBSTACLES if not world_model.contains(obstacle))
+        benchmarks[f"world_model/world_model_update_indexed/{size}"] = lambda world_model=world_model, obstacle=unknown_obstacle: world_model.copy().add(obstacle)
+        benchmarks[f"world_model/obstacle_in_world_model_known_indexed/{size}"] = lambda world_model=world_model, obstacle=known_obstacle: world_model.contains(obstacle)
+        benchmarks[f"world_model/obstacle_in_world_model_unknown_indexed/{size}"] = lambda world_model=world_model, obstacle=unknown_obstacle: world_model.contains(obstacle)
+    benchmarks["world_model/merge"] = lambda: merge(OBSTACLES[0], OBSTACLES[1])
+    return benchmarks
+
+def detection_benchmarks():
+    rover = create_team(1)[0]
+    rover.x, rover.y = OBSTACLES[0][0][0] + 20, OBSTACLES[0][0][1] + 5     # next to an obstacle
+    rover.obstacle_detection()                                              # obstacles in range are known -> steady state
+    return {"detection/obstacle_detection": rover.obstacle_detection}
+
+def communication_benchmarks():
+    benchmarks = {}
+    for comm_type, strategy in STRATEGIES.items():
+        for size in TEAM_SIZES:
+            rovers = create_team(size, comm_type)
+            sender = rovers[0]
+            candidates = list(range(MAX_MEMORY_COMM_CANDIDATES))                    # obstacle IDs
+            # the next create_team clears Rover.instantiated_rovers, so every team keeps its own dict and shares one
+            # TeamState for it (as Rover.team_state during a simulation), i.e. the snapshot is not rebuilt per call
+            instantiated_rovers = dict(Rover.instantiated_rovers)
+            state = TeamState(instantiated_rovers)
+            for rover in rovers:
+                rover.team_state = state
+
+            def send(sender=sender, candidates=candidates, strategy=strategy, instantiated_rovers=instantiated_rovers):
+                sender.comm_candidates = list(candidates)
+                sender.comm_active = True
+                strategy(sender, sender.comm_candidates, instantiated_rovers)
+                sender.scheduler.clear()                                    # messages are not delivered
+            benchmarks[f"communication/{comm_type}/{size}"] = send
+    return benchmarks
+
+def end_to_end_benchmarks():
+    def cycle():
+        random.seed(0)
+        run_cycle(START_POSITIONS[0], 3, "IntCom", 0.0, KINEMATICS, display=None, verbose=False)
+    return {"end_to_end/IntCom/3": cycle}
+
+BENCHMARK_GROUPS = [navigation_benchmarks, world_model_benchmarks, detection_benchmarks, communication_benchmarks, end_to_end_benchmarks]
+
+
+def measure(function, repeat=REPEAT):
+    """
+    :return: best and mean time per call [s] and the number of calls per repetition
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat, number)]
+    return {"best": min(times), "mean": sum(times) / len(times), "number": number, "repeat": repeat}
+
+def run_benchmarks(name_filter="", repeat=REPEAT):
+    results = {}
+    for group in BENCHMARK_GROUPS:
+        benchmarks = group()
+        for name, function in benchmarks.items():
+            if name_filter not in name:
+                continue
+            results[name] = measure(function, repeat)
+            print(f"{name:<55} {results[name]['best'] * 1000:12.4f} ms")
+    return {
+        "meta": {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(), "platform": platform.platform(), "kinematics": KINEMATICS},
+        "results": results,
+    }
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Compares the best times with a baseline.
+    :return: names of the benchmarks which are slower than the baseline by more than the tolerance
+    """
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline [ms]':>14} {'current [ms]':>14} {'ratio':>8}")
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        reference = baseline["results"][name]["best"]
+        ratio = result["best"] / reference if reference > 0 else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<55} {reference * 1000:14.4f} {result['best'] * 1000:14.4f} {ratio:8.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for the hot paths of the rover simulation")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file for the results")
+    parser.add_argument("--compare", help="JSON file of a baseline run, regressions are flagged")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) > {args.tolerance:.0%}")
+            sys.exit(1)
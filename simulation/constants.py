@@ -1,4 +1,4 @@
-from world.obstacles import OBSTACLES
+from world.obstacle_map import OBSTACLES
 
 # definition of colours
 BLACK = (0, 0, 0)
@@ -20,13 +20,37 @@ Prameters to be chosen by User
 '''
 
 # number of simulation cycles
-CYCLES = 1                                # 1-10
+CYCLES = 1                                # 1-10 (further start position sets are generated on demand)
+BASE_SEED = 0                             # random numbers of cycle n are seeded with BASE_SEED + n (0: same seeds as the sweep)
   
 # rover specifics
-NUMBER_OF_ROVERS = 3                     # 1-50
+NUMBER_OF_ROVERS = 3                     # 1-50 (more start positions are generated on demand)
 COMM_TYPE = "IntCom"                       # choices: NoCom, PlaCom, UtiCom, RecCom, IntCom, FulCom
 INITIAL_DISTANCE = 30                     # initial distance to any obstacles
 TARGET_COORDINATES = (110, 50)
  
 # communication loss rate (0.0 = 0%, 0.04 = 4%, 0.08 = 8%, 0.12 = 12%)
-COM_LOSS_RATE = 0.0 
\ No newline at end of file
+COM_LOSS_RATE = 0.0 
+
+# Plan-Aware Communication (PlaCom): uncertainty threshold θ and forecast horizon T in steps
+PLACOM_THETA = 0.3
+PLACOM_HORIZON = 4
+
+# visualisation
+HEADLESS = False                          # True: no window, no frame limiter -> simulation runs as fast as the CPU allows
+RENDER_EVERY_N_TICKS = 1                  # visual mode only: draw every Nth simulation step (1 = every step)
+
+# simulation engine
+KINEMATICS = "per_rover"                  # choices: per_rover (Rover.move() per rover), fleet (vectorized RoverFleet step, scales to several hundred rovers), event (fleet, steps without events are skipped)
+PLANNER = "a_star"                        # choices: a_star (original planner), lazy_a_star (closed set, lazy edge checks, faster, but the paths can differ from a_star)
+WORLD_MODEL_BACKEND = "grid"               # choices: polygon (shapely containment/overlap checks), grid (occupancy grid of the known cells, constant time checks), indexed (WorldModel: bucket index, all overlapping entries merged into their exact union)
+SKIP_INFORMED_RECEIVERS = False           # True: no messages about obstacles the receiver already knows (changes the number of not useful communications)
+AGGREGATE_MESSAGES = False                # True: IntCom, RecCom and FulCom send all selected obstacles for a receiver in one message (one path check per message)
+
+# instrumentation (no overhead if disabled)
+INSTRUMENT_HOT_PATHS = False              # True: timing of the hot path functions per rover and per step, summary + export after each cycle
+PROFILE_CYCLES = False                    # True: additionally cProfile every cycle (.prof file in the output folder)
+
+# output
+RESULTS_DATABASE = "results.sqlite"       # SQLite database in the output folder, every simulation cycle is added (None: CSV files only)
+TIME_SERIES_FILE = "time_series.csv"      # network load and Environmental Awareness Ratio per second, written during the simulation (None: off)
\ No newline at end of file
@@ -1,106 +1,208 @@
 from constants import *
-from world.obstacles import OBSTACLES
+from world.obstacle_map import OBSTACLES
 from world.start_positions import START_POSITIONS
 from world.functions import *
 from vehicle.rover.rover import Rover
+from vehicle.rover.fleet import RoverFleet, EventDrivenFleet
+from vehicle.scheduler import EventScheduler
 from vehicle.draw_functions import *
 from output_logger.functions import *
+from output_logger.instrumentation import INSTRUMENTATION
+from output_logger.results_store import ResultsStore
+from output_logger.time_series import TimeSeriesLogger
+import os
+import time
+import random
 import pygame
  
 
-def main():
-    pygame.init()
- 
-    # initialising the screen
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Rover Simulator")
-    clock = pygame.time.Clock()
-    font = pygame.font.Font(None, 16)
+def run_cycle(start_positions, number_of_rovers=NUMBER_OF_ROVERS, comm_type=COMM_TYPE, com_loss_rate=COM_LOSS_RATE, kinematics=KINEMATICS, display=None, verbose=True, time_series=None,
+              placom_theta=PLACOM_THETA, placom_horizon=PLACOM_HORIZON):
+    """
+    Performs one simulation cycle until all rovers have reached the target.
+    :param start_positions: dict with the start position per rover ID.
+    :param kinematics: "per_rover" (Rover.move() for every rover), "fleet" (vectorized RoverFleet step) or "event" (fleet, steps without events are skipped).
+    :param display: (screen, clock, renderer, render_every_n_ticks) in visual mode, None in headless mode.
+    :param verbose: if True, the progress of the cycle is printed.
+    :param time_series: TimeSeriesLogger for network load and environmental awareness, None: no streaming.
+    :param placom_theta, placom_horizon: uncertainty threshold and forecast horizon of PlaCom.
+    :return: rovers, number of useful and not useful communications, network load data [[times], [active communications], [message payload]]
+             (None if the samples were streamed to time_series, they are read back with time_series.network_load()).
+    """
+    start_time = time.perf_counter()
+                
+    # initialising count variables
+    simulation_time = 0                           
+    tick = 0                                      # number of performed simulation steps
+    ticks_per_sample = round(1 / TIME_STEP)       # network load and mean EAR are sampled every full second
+    number_of_rovers_in_target = 0
+    useful_comms = 0
+    not_useful_comms = 0
+    network_load_data = [[0], [0], [0]] if time_series is None else None     # network load per time (kept in memory if not streamed): number of messages and number of obstacles in the messages
+    total_messages = 0
+    total_payload = 0
     
- 
-    rover_times_data = [[] for i in range(NUMBER_OF_ROVERS+3)]          # list to store the elapsed time to reach the target per rover and the performed communications
-    network_load_data = [[0] for i in range(CYCLES * 2)]                # list to store the network load per time
+    # event scheduler for message delivery and communication reactivation (simulated time)
+    scheduler = EventScheduler(simulation_time)
     
-    for sim_cycle in range(CYCLES):
-        # rover startpositions
-        #START_POSITIONS = {1: (125, 50), 2: (165, 50), 3: (250, 450), 4: (480, 440), 5: (480, 560), 6: (40, 550), 7: (30, 40), 8: (90, 330), 9: (390, 130), 10: (570, 580)}
-        #START_POSITIONS = {1: (150, 170), 2: (520, 310), 3: (250, 450), 4: (480, 440), 5: (480, 560), 6: (40, 550), 7: (30, 40), 8: (90, 330), 9: (390, 130), 10: (570, 580)}
-        start_time = pygame.time.get_ticks()
-                    
-        # initialising count variables
-        simulation_time = 0                           
-        number_of_rovers_in_target = 0
-        useful_comms = 0
-        not_useful_comms = 0
-        
-        # generating rover instances
-        rovers = [Rover(ID, START_POSITIONS[sim_cycle][ID], TARGET_COORDINATES, WIDTH, HEIGHT, COMM_TYPE, simulation_time) for ID in range(1, NUMBER_OF_ROVERS + 1)]
-                    
-        # Main loop
-        running = True
-        while running:
+    # generating rover instances
+    Rover.instantiated_rovers.clear()             # no team members of previous cycles
+    rovers = [Rover(ID, start_positions[ID], TARGET_COORDINATES, WIDTH, HEIGHT, comm_type, simulation_time, scheduler, com_loss_rate, placom_theta, placom_horizon)
+              for ID in range(1, number_of_rovers + 1)]
+    if kinematics == "event":
+        fleet = EventDrivenFleet(rovers, scheduler)
+    elif kinematics == "fleet":
+        fleet = RoverFleet(rovers)
+    else:
+        fleet = None
+    INSTRUMENTATION.start_cycle()
+    if display is not None:
+        display[2].reset()
+    if time_series is not None:
+        mean_of_known_obstacles = sum(rover.number_of_known_obstacles for rover in rovers)/number_of_rovers
+        time_series.append(simulation_time, 0, 0, mean_of_known_obstacles, mean_of_known_obstacles / NUMBER_OF_OBSTACLES)
+                
+    # Main loop
+    running = True
+    while running:
+        render = display is not None and tick % display[3] == 0
+        if render:
+            screen, clock, renderer, _ = display
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-            screen.fill(WHITE)
-            
-            # Draw the target and obstacles
-            pygame.draw.rect(screen, BLACK, (TARGET_COORDINATES[0]-6, TARGET_COORDINATES[1]-6, 20, 20))
-            text_surface = font.render("G", True, WHITE)
-            screen.blit(text_surface, (TARGET_COORDINATES[0]-3, TARGET_COORDINATES[1]-3))
-            for obstacle in OBSTACLES:
-                pygame.draw.polygon(screen, RED, obstacle)
-            
-            # move and draw the rovers
-            
+        
+        INSTRUMENTATION.tick = tick
+        
+        # deliver messages and reactivate communications which are due
+        scheduler.run_until(simulation_time)
+        
+        # move and draw the rovers
+        if fleet is not None:
+            arrived_rovers = fleet.step(simulation_time)
+        else:
             for rover in rovers:
                 rover.move()
                 rover.sim_time = simulation_time
-                draw_rover(rover, screen)
-                draw_path(rover, screen)
-                
-                # Check if rover has reached the target
-                if rover.reached_target and not rover.counted:
-                    number_of_rovers_in_target += 1
-                    rover.counted = True
-                    rover.elapsed_time_to_target = simulation_time
+            arrived_rovers = [rover for rover in rovers if rover.reached_target and not rover.counted]
+        if render:
+            renderer.draw(rovers)           # cached obstacles and target, only the changed areas are updated
+        
+        for rover in arrived_rovers:
+            # Check if rover has reached the target
+            if rover.reached_target and not rover.counted:
+                number_of_rovers_in_target += 1
+                rover.counted = True
+                rover.elapsed_time_to_target = simulation_time
+                if verbose:
                     print(f"Elapsed simulated time until Rover {rover.id} has reached the target: {rover.elapsed_time_to_target:.1f}s")
-                    
-                    # Check if all rovers have reached the target
-                    if number_of_rovers_in_target >= NUMBER_OF_ROVERS:
-                        for rover in rovers:
-                            useful_comms += rover.useful_comms
-                            not_useful_comms += rover.not_useful_comms
+                
+                # Check if all rovers have reached the target
+                if number_of_rovers_in_target >= number_of_rovers:
+                    for rover in rovers:
+                        useful_comms += rover.useful_comms
+                        not_useful_comms += rover.not_useful_comms
+                    if verbose:
                         print("All Rovers have reached the target!")
-                        elapsed_time = (pygame.time.get_ticks() - start_time) / 1000  
+                        elapsed_time = time.perf_counter() - start_time
                         print(f"Elapsed real time: {elapsed_time:.1f}s")
                         print("Number of useful communications: ", useful_comms)
                         print("Number of not useful communications: ", not_useful_comms)
-                        running = False          
-            simulation_time += TIME_STEP                            
-                       
-            #storing the network load and mean EAR every full second
-            if round(simulation_time, 2) == round(simulation_time):
-                active_communications = sum(rover.active_communications for rover in rovers)
-                network_load_data[2*sim_cycle].append(simulation_time)
-                network_load_data[2*sim_cycle+1].append(active_communications)
-                for rover in rovers:
-                    
-                    rover.active_communications = 0
- 
-                mean_of_known_obstacles = sum(rover.number_of_known_obstacles for rover in rovers)/NUMBER_OF_ROVERS
+                        print(f"Network load: {total_messages} messages, {total_payload} obstacles")
+                    running = False          
+        simulation_time += TIME_STEP                            
+        tick += 1
+        first_tick = tick
+        
+        # event-driven kinematics: skipping the following steps without events (until the next drawn step if rendered)
+        if kinematics == "event" and running:
+            skipped_ticks = fleet.skip_quiet_steps(simulation_time, TIME_STEP, display[3] - 1 - tick % display[3] if display is not None else None)
+            simulation_time += skipped_ticks * TIME_STEP
+            tick += skipped_ticks
+                   
+        #storing the network load and mean EAR every full second (also in the skipped steps, nothing which is sampled changes in them)
+        for sample_tick in range(-(-first_tick // ticks_per_sample) * ticks_per_sample, tick + 1, ticks_per_sample):
+            active_communications = sum(rover.active_communications for rover in rovers)
+            message_payload = sum(rover.message_payload for rover in rovers)
+            total_messages += active_communications
+            total_payload += message_payload
+            if network_load_data is not None:
+                network_load_data[0].append(sample_tick * TIME_STEP)
+                network_load_data[1].append(active_communications)
+                network_load_data[2].append(message_payload)
+            for rover in rovers:
                 
-            pygame.display.flip()
+                rover.active_communications = 0
+                rover.message_payload = 0
+ 
+            mean_of_known_obstacles = sum(rover.number_of_known_obstacles for rover in rovers)/number_of_rovers
+            if time_series is not None:
+                time_series.append(sample_tick * TIME_STEP, active_communications, message_payload, mean_of_known_obstacles, mean_of_known_obstacles / NUMBER_OF_OBSTACLES)
+            
+        if render:
             clock.tick(50)
+    
+    if time_series is not None:
+        time_series.flush()
+    INSTRUMENTATION.end_cycle(f"{comm_type}_{number_of_rovers}")
+    return rovers, useful_comms, not_useful_comms, network_load_data
+
+
+def main(headless=HEADLESS, render_every_n_ticks=RENDER_EVERY_N_TICKS, kinematics=KINEMATICS):
+    """
+    Performs all simulation cycles and stores the output data.
+    :param headless: if True, no window is opened and no frame limiter is used (batch mode).
+    :param render_every_n_ticks: visual mode only, every Nth simulation step is drawn and rate limited.
+    :param kinematics: "per_rover" (Rover.move() for every rover), "fleet" (vectorized RoverFleet step) or "event" (fleet, steps without events are skipped).
+    """
+    if INSTRUMENT_HOT_PATHS:
+        INSTRUMENTATION.enable(profile=PROFILE_CYCLES)
+    
+    display = None
+    if not headless:
+        pygame.init()
+ 
+        # initialising the screen
+        screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("Rover Simulator")
+        clock = pygame.time.Clock()
+        font = pygame.font.Font(None, 16)
+        display = (screen, clock, Renderer(screen, OBSTACLES, TARGET_COORDINATES, font), max(1, int(render_every_n_ticks)))
+    
+ 
+    rover_times_data = [[] for i in range(NUMBER_OF_ROVERS+3)]          # list to store the elapsed time to reach the target per rover and the performed communications
+    time_series = TimeSeriesLogger(os.path.join(os.getcwd(), 'simulation', 'output_logger', 'plotted_data', TIME_SERIES_FILE)) if TIME_SERIES_FILE else None
+    results_store = ResultsStore(os.path.join(os.getcwd(), 'simulation', 'output_logger', 'plotted_data', RESULTS_DATABASE)) if RESULTS_DATABASE else None
+    network_load_data = [[0] for i in range(CYCLES * 2)]                # network load per time and cycle (columns of the time series file if streamed)
+    
+    for sim_cycle in range(CYCLES):
+        # rover startpositions
+        #START_POSITIONS = {1: (125, 50), 2: (165, 50), 3: (250, 450), 4: (480, 440), 5: (480, 560), 6: (40, 550), 7: (30, 40), 8: (90, 330), 9: (390, 130), 10: (570, 580)}
+        #START_POSITIONS = {1: (150, 170), 2: (520, 310), 3: (250, 450), 4: (480, 440), 5: (480, 560), 6: (40, 550), 7: (30, 40), 8: (90, 330), 9: (390, 130), 10: (570, 580)}
+        seed = BASE_SEED + sim_cycle
+        random.seed(seed)                                               # rover colours, message delays and losses are reproducible per cycle
+        if time_series is not None:
+            time_series.cycle = sim_cycle + 1
+        rovers, useful_comms, not_useful_comms, cycle_network_load_data = run_cycle(START_POSITIONS[sim_cycle], NUMBER_OF_ROVERS, COMM_TYPE, COM_LOSS_RATE, kinematics, display,
+                                                                                    time_series=time_series)
+        if cycle_network_load_data is None:
+            cycle_network_load_data = time_series.network_load(sim_cycle + 1)                  # streamed, the columns are read from the time series file
+        network_load_data[2*sim_cycle:2*sim_cycle+2] = cycle_network_load_data[:2]
         
         #storing the elapsed simulation time per rover until reaching target + number of communications after each simulation cycle
         store_rover_times(rovers, rover_times_data, useful_comms, not_useful_comms)
+        if results_store is not None:
+            results_store.add_run(COMM_TYPE, NUMBER_OF_ROVERS, COM_LOSS_RATE, sim_cycle, [rover.elapsed_time_to_target for rover in rovers], useful_comms, not_useful_comms,
+                                  cycle_network_load_data, seed=seed, kinematics=kinematics)
        
     #saving data to csv files after all simulation cycles        
     write_rover_times_to_file(COMM_TYPE, NUMBER_OF_ROVERS, rover_times_data, 'rover_times_data.csv')
     write_data_to_file(COMM_TYPE, CYCLES, NUMBER_OF_ROVERS, network_load_data, 'network_load_data.csv')
+    if results_store is not None:
+        results_store.close()
     
-    pygame.quit()
+    if not headless:
+        pygame.quit()
  
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import importlib
+from collections import defaultdict
+
+
+# functions which are timed if the instrumentation is enabled: (module, function or Class.method, index of the rover argument or None)
+HOT_PATHS = [
+    ("vehicle.rover.rover", "Rover.move", 0),
+    ("vehicle.rover.rover", "Rover.obstacle_detection", 0),
+    ("vehicle.rover.rover", "Rover.communication", 0),
+    ("vehicle.rover.rover", "Rover.receive_message", 0),
+    ("vehicle.rover.rover", "Rover.receive_messages", 0),
+    ("vehicle.rover.fleet", "RoverFleet.step", None),
+    ("vehicle.communication", "time_comm", 0),
+    ("vehicle.communication", "plan_aware_comm", 0),
+    ("vehicle.communication", "utility_aware_comm", 0),
+    ("vehicle.communication", "receiver_aware_comm", 0),
+    ("vehicle.communication", "integrated_comm", 0),
+    ("vehicle.communication", "full_comm", 0),
+    ("vehicle.navigation", "perform_navigation", None),
+    ("vehicle.navigation", "worldmodel_intersects_path", None),
+    ("vehicle.navigation", "a_star", None),
+    ("vehicle.navigation", "lazy_a_star", None),
+    ("vehicle.world_model", "world_model_update", None),
+    ("vehicle.world_model", "obstacle_in_world_model", None),
+    ("vehicle.draw_functions", "draw_rover", 0),
+    ("vehicle.draw_functions", "draw_path", 0),
+]
+
+
+class Instrumentation:
+    """
+    Opt-in timing of the hot path functions of the simulation.
+    While disabled no function is wrapped, so there is no overhead. enable() replaces the HOT_PATHS functions
+    (in their module and in every module which imported them) by timing wrappers, which record the cumulative
+    time and number of calls per function, per rover and per simulation step. Times are inclusive, i.e.
+    the time of a_star is also part of perform_navigation and obstacle_detection. Functions without a rover
+    argument are attributed to the rover of the calling function.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.profile = False                    # additionally run cProfile per cycle
+        self.output_folder = None
+        self.tick = 0                           # current simulation step, set by the simulation loop
+        self._originals = []                    # (owner, attribute name, original function)
+        self._stack = []                        # [phase, rover id, child time] of the running wrapped functions
+        self._profiler = None
+        self._cycle = 0
+        self.reset()
+
+    def reset(self):
+        self.totals = defaultdict(lambda: [0.0, 0])         # phase -> [time, calls]
+        self.per_rover = defaultdict(lambda: [0.0, 0])      # (phase, rover id) -> [time, calls]
+        self.per_tick = defaultdict(lambda: defaultdict(float))     # tick -> phase -> time
+        self.folded = defaultdict(float)                    # call stack "phase;phase;..." -> exclusive time (flame graph)
+        self.cycle_time = 0.0
+        self._cycle_start = None
+
+    def enable(self, profile=False, output_folder=None):
+        """
+        Wraps the HOT_PATHS functions.
+        :param profile: if True, every cycle is additionally profiled with cProfile (.prof file).
+        :param output_folder: folder for the exported files, None: simulation/output_logger/plotted_data.
+        """
+        self.profile = profile
+        self.output_folder = output_folder or os.path.join(os.getcwd(), 'simulation', 'output_logger', 'plotted_data')
+        if self.enabled:
+            return
+        for module_name, qualified_name, rover_argument in HOT_PATHS:
+            module = importlib.import_module(module_name)
+            owner = module
+            *class_names, function_name = qualified_name.split(".")
+            for class_name in class_names:
+                owner = getattr(owner, class_name)
+            original = getattr(owner, function_name)
+            wrapper = self._wrap(original, function_name, rover_argument)
+            if class_names:
+                self._patch(owner, function_name, original, wrapper)
+            else:
+                # function is referenced by every module which imported it (i.e. with "from ... import *")
+                for other in list(sys.modules.values()):
+                    if getattr(other, function_name, None) is original:
+                        self._patch(other, function_name, original, wrapper)
+        self.enabled = True
+
+    def disable(self):
+        """
+        Restores the original functions.
+        """
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def _patch(self, owner, name, original, wrapper):
+        self._originals.append((owner, name, original))
+        setattr(owner, name, wrapper)
+
+    def _wrap(self, function, phase, rover_argument):
+        stack = self._stack
+
+        def wrapper(*args, **kwargs):
+            if rover_argument is not None and len(args) > rover_argument:
+                rover_id = getattr(args[rover_argument], "id", None)
+            else:
+                rover_id = stack[-1][1] if stack else None
+            frame = [phase, rover_id, 0.0]
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][2] += elapsed
+                self._record(phase, rover_id, elapsed, elapsed - frame[2], [entry[0] for entry in stack])
+
+        wrapper.__wrapped__ = function
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+
+    def _record(self, phase, rover_id, elapsed, exclusive, callers):
+        total = self.totals[phase]
+        total[0] += elapsed
+        total[1] += 1
+        rover_total = self.per_rover[(phase, rover_id)]
+        rover_total[0] += elapsed
+        rover_total[1] += 1
+        self.per_tick[self.tick][phase] += elapsed
+        self.folded[";".join(callers + [phase])] += exclusive
+
+    def start_cycle(self):
+        if not self.enabled:
+            return
+        self.reset()
+        self._cycle += 1
+        self._cycle_start = time.perf_counter()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def end_cycle(self, label=""):
+        """
+        Prints the summary of the cycle and exports the recorded data (JSON, folded stacks for flame graphs, cProfile stats).
+        """
+        if not self.enabled or self._cycle_start is None:
+            return
+        self.cycle_time = time.perf_counter() - self._cycle_start
+        name = f"instrumentation_{label}_cycle_{self._cycle}" if label else f"instrumentation_cycle_{self._cycle}"
+        os.makedirs(self.output_folder, exist_ok=True)
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(os.path.join(self.output_folder, name + ".prof"))     # i.e. snakeviz, flameprof
+            self._profiler = None
+        self.print_summary(label)
+        self.export_json(os.path.join(self.output_folder, name + ".json"))
+        self.export_folded(os.path.join(self.output_folder, name + ".folded"))
+
+    def print_summary(self, label=""):
+        print(f"\nHot path summary {label} (cycle {self._cycle}, {self.cycle_time:.1f}s real time, inclusive times)")
+        print(f"{'function':<28} {'calls':>10} {'total [s]':>10} {'per call [ms]':>14} {'share':>7}")
+        for phase, (elapsed, calls) in sorted(self.totals.items(), key=lambda item: item[1][0], reverse=True):
+            share = elapsed / self.cycle_time if self.cycle_time else 0
+            print(f"{phase:<28} {calls:>10} {elapsed:>10.3f} {elapsed / calls * 1000:>14.4f} {share:>7.1%}")
+
+        rover_ids = sorted({rover_id for _, rover_id in self.per_rover if rover_id is not None})
+        phases = [phase for phase in self.totals if any((phase, rover_id) in self.per_rover for rover_id in rover_ids)]
+        if rover_ids and phases:
+            print(f"\n{'rover':<6}" + "".join(f" {phase[:18]:>18}" for phase in phases))
+            for rover_id in rover_ids:
+                print(f"{rover_id:<6}" + "".join(f" {self.per_rover[(phase, rover_id)][0] if (phase, rover_id) in self.per_rover else 0:>18.3f}" for phase in phases))
+
+    def export_json(self, path):
+        data = {
+            "cycle_time": self.cycle_time,
+            "totals": {phase: {"time": elapsed, "calls": calls} for phase, (elapsed, calls) in self.totals.items()},
+            "per_rover": [{"phase": phase, "rover": rover_id, "time": elapsed, "calls": calls} for (phase, rover_id), (elapsed, calls) in self.per_rover.items()],
+            "per_tick": {tick: dict(phases) for tick, phases in self.per_tick.items()},
+        }
+        with open(path, "w") as file:
+            json.dump(data, file)
+
+    def export_folded(self, path):
+        """
+        Folded call stacks in microseconds (input format of flamegraph.pl and speedscope).
+        """
+        with open(path, "w") as file:
+            for stack, elapsed in self.folded.items():
+                file.write(f"{stack} {round(elapsed * 1e6)}\n")
+
+
+# instrumentation of the simulation, enabled by the simulation loop (INSTRUMENT_HOT_PATHS)
+INSTRUMENTATION = Instrumentation()
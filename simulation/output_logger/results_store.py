@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import time
+from output_logger.functions import write_rover_times_to_file, write_data_to_file
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    comm_type TEXT NOT NULL,
+    number_of_rovers INTEGER NOT NULL,
+    com_loss_rate REAL NOT NULL,
+    start_position_set INTEGER NOT NULL,
+    seed INTEGER,
+    kinematics TEXT,
+    useful_comms INTEGER NOT NULL,
+    not_useful_comms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rover_times (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    rover_id INTEGER NOT NULL,
+    elapsed_time REAL NOT NULL,
+    PRIMARY KEY (run_id, rover_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS network_load (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    time REAL NOT NULL,
+    active_communications INTEGER NOT NULL,
+    message_payload INTEGER,
+    PRIMARY KEY (run_id, time)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_configuration ON runs (comm_type, number_of_rovers, com_loss_rate, start_position_set, seed);
+CREATE INDEX IF NOT EXISTS rover_times_rover ON rover_times (rover_id, elapsed_time);
+"""
+
+
+class ResultsStore:
+    """
+    Results of simulation runs in a SQLite database: configuration, elapsed time per rover, communication counters
+    and network load per time. Runs of different configurations are kept side by side, the CSV files of main.py
+    (plotting scripts) can be exported for every configuration.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        columns = [column[1] for column in self.connection.execute("PRAGMA table_info(network_load)")]
+        if "message_payload" not in columns:       # database of an older version
+            self.connection.execute("ALTER TABLE network_load ADD COLUMN message_payload INTEGER")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_run(self, comm_type, number_of_rovers, com_loss_rate, start_position_set, rover_times, useful_comms, not_useful_comms,
+                network_load_data, seed=None, kinematics=None):
+        """
+        Stores one run (simulation cycle) in a single transaction.
+        :param start_position_set: index of the start position set (cycle).
+        :param rover_times: elapsed simulation time until the target per rover, rover IDs 1..n.
+        :param network_load_data: [[times], [active communications], [message payload]] as returned by run_cycle (payload optional),
+                                  the columns can be iterators (i.e. TimeSeriesLogger.network_load), they are consumed row by row.
+        :return: ID of the run.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created, comm_type, number_of_rovers, com_loss_rate, start_position_set, seed, kinematics, useful_comms, not_useful_comms) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.strftime("%Y-%m-%d %H:%M:%S"), comm_type, number_of_rovers, com_loss_rate, start_position_set, seed, kinematics, useful_comms, not_useful_comms))
+            run_id = cursor.lastrowid
+            self.connection.executemany("INSERT INTO rover_times VALUES (?, ?, ?)",
+                                        [(run_id, rover_id, elapsed_time) for rover_id, elapsed_time in enumerate(rover_times, start=1)])
+            payload = network_load_data[2] if len(network_load_data) > 2 else [None] * len(network_load_data[0])
+            self.connection.executemany("INSERT OR REPLACE INTO network_load VALUES (?, ?, ?, ?)",
+                                        ((run_id, load_time, load, message_payload) for load_time, load, message_payload in zip(network_load_data[0], network_load_data[1], payload)))
+        return run_id
+
+    def completed_runs(self):
+        """
+        :return: set of (comm_type, number_of_rovers, com_loss_rate, start_position_set, seed) of all stored runs.
+        """
+        return set(self.connection.execute("SELECT comm_type, number_of_rovers, com_loss_rate, start_position_set, seed FROM runs"))
+
+    def latest_runs(self, comm_type, number_of_rovers, com_loss_rate, seed=None):
+        """
+        :return: dict start_position_set -> ID of the latest run of the configuration.
+        """
+        query = ("SELECT start_position_set, MAX(id) FROM runs WHERE comm_type = ? AND number_of_rovers = ? AND com_loss_rate = ?"
+                 + (" AND seed = ?" if seed is not None else "") + " GROUP BY start_position_set")
+        parameters = (comm_type, number_of_rovers, com_loss_rate) + ((seed,) if seed is not None else ())
+        return dict(self.connection.execute(query, parameters))
+
+    def rover_times(self, run_id):
+        return [elapsed_time for elapsed_time, in self.connection.execute("SELECT elapsed_time FROM rover_times WHERE run_id = ? ORDER BY rover_id", (run_id,))]
+
+    def communications(self, run_id):
+        return self.connection.execute("SELECT useful_comms, not_useful_comms FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+    def network_load(self, run_id):
+        rows = self.connection.execute("SELECT time, active_communications FROM network_load WHERE run_id = ? ORDER BY time", (run_id,)).fetchall()
+        return [[row[0] for row in rows], [row[1] for row in rows]]
+
+    def message_totals(self, run_id):
+        """
+        :return: (number of messages, number of obstacles in the messages) of a run, payload None for runs without payload data.
+        """
+        return self.connection.execute("SELECT SUM(active_communications), SUM(message_payload) FROM network_load WHERE run_id = ?", (run_id,)).fetchone()
+
+    def summary(self):
+        """
+        Aggregates of all configurations.
+        :return: list of (comm_type, number_of_rovers, com_loss_rate, runs, mean elapsed time, max elapsed time, mean useful comms, mean not useful comms)
+        """
+        return self.connection.execute("""
+            SELECT r.comm_type, r.number_of_rovers, r.com_loss_rate, COUNT(DISTINCT r.id), AVG(t.elapsed_time), MAX(t.elapsed_time),
+                   AVG(r.useful_comms), AVG(r.not_useful_comms)
+            FROM runs r JOIN rover_times t ON t.run_id = r.id
+            GROUP BY r.comm_type, r.number_of_rovers, r.com_loss_rate
+            ORDER BY r.comm_type, r.number_of_rovers, r.com_loss_rate""").fetchall()
+
+    def export_csv(self, comm_type, number_of_rovers, com_loss_rate, rover_times_filename, network_load_filename, seed=None):
+        """
+        Writes the rover times and network load files of main.py for a configuration (latest run per start position set).
+        :return: number of exported cycles.
+        """
+        runs = self.latest_runs(comm_type, number_of_rovers, com_loss_rate, seed)
+        rover_times_data = [[] for i in range(number_of_rovers+3)]
+        network_load_data = []
+        for start_position_set in sorted(runs):
+            run_id = runs[start_position_set]
+            for i, elapsed_time in enumerate(self.rover_times(run_id)):
+                rover_times_data[i].append(round(elapsed_time))
+            useful_comms, not_useful_comms = self.communications(run_id)
+            rover_times_data[-2].append(useful_comms)
+            rover_times_data[-1].append(not_useful_comms)
+            network_load_data.extend(self.network_load(run_id))
+        if runs:
+            write_rover_times_to_file(comm_type, number_of_rovers, rover_times_data, rover_times_filename)
+            write_data_to_file(comm_type, len(runs), number_of_rovers, network_load_data, network_load_filename)
+        return len(runs)
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+
+
+COLUMNS = ["Cycle", "Time [s]", "Active communications", "Message payload", "Mean known obstacles", "Environmental Awareness Ratio"]
+FORMATS = ["%d", "%.2f", "%d", "%d", "%.3f", "%.4f"]
+
+
+class TimeSeriesColumn:
+    """
+    Values of one column of a cycle in the file of a TimeSeriesLogger. The values are read from the file on every
+    iteration (not kept in memory), so the column can be iterated several times.
+    """
+
+    def __init__(self, logger, cycle, name):
+        self.logger = logger
+        self.cycle = cycle
+        self.index = COLUMNS.index(name)
+
+    def __iter__(self):
+        self.logger.flush()
+        convert = int if FORMATS[self.index] == "%d" else float
+        with open(self.logger.path, newline="") as file:
+            next(file)                      # header
+            for line in file:
+                values = line.rstrip("\r\n").split(";")
+                if int(values[0]) == self.cycle:
+                    yield convert(values[self.index])
+
+
+class TimeSeriesLogger:
+    """
+    Streaming logger for the metrics sampled during the simulation (network load, environmental awareness).
+    Samples are stored in a fixed-size NumPy ring buffer and appended to a CSV file (";" separated) every flush_every
+    samples, whenever the buffer is full and at the end of every cycle, so the memory is constant and a crash or an
+    interruption loses at most the last flush_every samples.
+    The network load of a cycle is read back from the file (network_load) for the results store and the CSV export.
+    """
+
+    def __init__(self, path, capacity=1024, flush_every=10):
+        self.path = path
+        self.capacity = capacity
+        self.flush_every = min(flush_every, capacity)   # samples (simulated seconds) between two writes
+        self.buffer = np.zeros((capacity, len(COLUMNS)))
+        self.count = 0                      # number of samples since the start
+        self.flushed = 0                    # number of samples written to the file
+        self.cycle = 0                      # cycle of the following samples
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", newline="") as file:
+            file.write(";".join(COLUMNS) + "\n")
+
+    def append(self, time, active_communications, message_payload, mean_known_obstacles, awareness_ratio):
+        self.buffer[self.count % self.capacity] = (self.cycle, time, active_communications, message_payload, mean_known_obstacles, awareness_ratio)
+        self.count += 1
+        if self.count - self.flushed >= self.flush_every:
+            self.flush()
+
+    def network_load(self, cycle):
+        """
+        :return: network load data of a cycle [[times], [active communications], [message payload]] (format of run_cycle)
+                 as TimeSeriesColumns, read from the file on every iteration.
+        """
+        return [TimeSeriesColumn(self, cycle, "Time [s]"), TimeSeriesColumn(self, cycle, "Active communications"), TimeSeriesColumn(self, cycle, "Message payload")]
+
+    def flush(self):
+        """
+        Appends all samples which are not written yet to the file.
+        """
+        if self.count == self.flushed:
+            return
+        indices = np.arange(self.flushed, self.count) % self.capacity
+        with open(self.path, "a", newline="") as file:
+            np.savetxt(file, self.buffer[indices], fmt=FORMATS, delimiter=";")
+        self.flushed = self.count
@@ -0,0 +1,99 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from constants import *
+from world.start_positions import START_POSITIONS
+from output_logger.results_store import ResultsStore
+from main import run_cycle
+
+
+'''
+Parameter sweep: every combination of the following parameters is simulated for every start position set (cycle).
+The runs are independent and spread across a process pool. Each worker process imports the obstacle geometry
+and the start positions once and reuses them for all its runs. Every finished run is committed to the results
+database SWEEP_DATABASE, an interrupted sweep resumes with the missing runs.
+'''
+
+SWEEP_COMM_TYPES = ["NoCom", "PlaCom", "UtiCom", "RecCom", "IntCom", "FulCom"]
+SWEEP_NUMBERS_OF_ROVERS = [2, 10, 50]
+SWEEP_COM_LOSS_RATES = [0.0, 0.04, 0.08, 0.12]
+SWEEP_CYCLES = 10                                   # start position sets 1-10
+SWEEP_KINEMATICS = KINEMATICS
+SWEEP_MAX_WORKERS = None                            # None: one worker per CPU
+SWEEP_DATABASE = "sweep_results.sqlite"
+
+
+def output_path(filename):
+    output_folder = os.path.join(os.getcwd(), 'simulation', 'output_logger', 'plotted_data')
+    os.makedirs(output_folder, exist_ok=True)
+    return os.path.join(output_folder, filename)
+
+def sweep_runs(comm_types, numbers_of_rovers, com_loss_rates, cycles):
+    """
+    Expands the parameter grid into a list of runs. The seed of a run is its cycle (start position set),
+    so all configurations are simulated with the same random numbers per cycle.
+    """
+    return [{"comm_type": comm_type, "number_of_rovers": number_of_rovers, "com_loss_rate": com_loss_rate, "cycle": cycle, "seed": cycle}
+            for comm_type, number_of_rovers, com_loss_rate, cycle in itertools.product(comm_types, numbers_of_rovers, com_loss_rates, range(cycles))]
+
+def run_key(run):
+    return (run["comm_type"], run["number_of_rovers"], run["com_loss_rate"], run["cycle"], run["seed"])
+
+def run_single(run, kinematics=SWEEP_KINEMATICS):
+    """
+    Performs a single run (one simulation cycle) in a worker process.
+    :return: the run extended by its results.
+    """
+    random.seed(run["seed"])
+    rovers, useful_comms, not_useful_comms, network_load_data = run_cycle(START_POSITIONS[run["cycle"]], run["number_of_rovers"], run["comm_type"],
+                                                                          run["com_loss_rate"], kinematics, display=None, verbose=False)
+    result = dict(run)
+    result["kinematics"] = kinematics
+    result["rover_times"] = [rover.elapsed_time_to_target for rover in rovers]
+    result["useful_comms"] = useful_comms
+    result["not_useful_comms"] = not_useful_comms
+    result["network_load"] = network_load_data
+    return result
+
+def store_result(store, result):
+    return store.add_run(result["comm_type"], result["number_of_rovers"], result["com_loss_rate"], result["cycle"], result["rover_times"],
+                         result["useful_comms"], result["not_useful_comms"], result["network_load"], seed=result["seed"], kinematics=result["kinematics"])
+
+def run_sweep(comm_types=SWEEP_COMM_TYPES, numbers_of_rovers=SWEEP_NUMBERS_OF_ROVERS, com_loss_rates=SWEEP_COM_LOSS_RATES, cycles=SWEEP_CYCLES,
+              max_workers=SWEEP_MAX_WORKERS, database=SWEEP_DATABASE):
+    """
+    Performs all runs of the parameter grid which are not finished yet and exports the merged results.
+    :return: the ResultsStore of the sweep (closed)
+    """
+    with ResultsStore(output_path(database)) as store:
+        finished = store.completed_runs()
+        runs = [run for run in sweep_runs(comm_types, numbers_of_rovers, com_loss_rates, cycles) if run_key(run) not in finished]
+        print(f"{len(finished)} runs finished, {len(runs)} runs pending")
+
+        if runs:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(run_single, run) for run in runs]
+                for number, future in enumerate(as_completed(futures), start=1):
+                    result = future.result()
+                    store_result(store, result)                 # committed -> finished runs survive an interruption
+                    print(f"[{number}/{len(runs)}] {result['comm_type']}, {result['number_of_rovers']} Rovers, loss rate {result['com_loss_rate']}, cycle {result['cycle'] + 1} finished")
+
+        write_merged_results(store, comm_types, numbers_of_rovers, com_loss_rates, cycles)
+    return store
+
+def write_merged_results(store, comm_types, numbers_of_rovers, com_loss_rates, cycles):
+    """
+    Writes the rover times and network load files (format of main.py) for every configuration with all cycles finished.
+    """
+    finished = store.completed_runs()
+    for comm_type, number_of_rovers, com_loss_rate in itertools.product(comm_types, numbers_of_rovers, com_loss_rates):
+        if any((comm_type, number_of_rovers, com_loss_rate, cycle, cycle) not in finished for cycle in range(cycles)):
+            continue
+        suffix = f"{comm_type}_{number_of_rovers}_{com_loss_rate}"
+        store.export_csv(comm_type, number_of_rovers, com_loss_rate, f"rover_times_data_{suffix}.csv", f"network_load_data_{suffix}.csv")
+
+
+if __name__ == "__main__":
+    run_sweep()
@@ -1,9 +1,9 @@
-import threading
 import random
-import time
-from shapely.geometry import Point, Polygon
-from world.obstacles import OBSTACLES
-from constants import COM_LOSS_RATE
+import numpy as np
+from world.obstacle_map import OBSTACLES
+from world.obstacle_index import OBSTACLE_INDEX
+from constants import SKIP_INFORMED_RECEIVERS, AGGREGATE_MESSAGES, PLACOM_THETA, PLACOM_HORIZON
+from vehicle.team_state import team_state
  
 COMM_DELAY_S = 1.2                                      # communication deactivation in seconds for time-triggered communication
  
@@ -11,24 +11,42 @@ def no_comm():
     pass
  
 def time_comm(sender, comm_candidates, instantiated_rovers):          # TimingBased
-    def comm_reactivation(sender):
-        start_time = sender.sim_time
-        # Function to rectivate communication after delay
-        while sender.comm_active == False:  
-            time.sleep(0.3)                             # delay to not update end_time too often, which causes performance issues for larger number of simulated rovers
-            end_time = sender.sim_time
-            if end_time - start_time >= COMM_DELAY_S:
-                sender.comm_active = True
-    
     comm_candidate = comm_candidates[0]
     for receiver_id, receiver in instantiated_rovers.items():
         if receiver != sender and not receiver.reached_target:  # Avoid sending message to itself and to instances that reached the target
-            receiver.active_communications += 1
-            threading.Thread(target=delayed_receive_message, args=(receiver, comm_candidate, sender)).start()
-    threading.Thread(target=comm_reactivation, args=(sender,)).start()
+            send_message(receiver, comm_candidate, sender)
+    comm_reactivation(sender)
     sender.comm_candidates.pop(0)           # Clear the first item of comm_candidates as it was just communicated
  
-def plan_aware_comm(sender, comm_candidates, instantiated_rovers, theta=0.3, horizon=4):
+def sigma_forecasts(sender, receivers, horizon):
+    """
+    Prognostizierte Unsicherheit σ̂_j(t) aller Empfänger für die Schritte 1..T (Plan-Aware Communication),
+    berechnet aus NumPy-Arrays der Positionen, distance_to_target und number_of_known_obstacles.
+    :return: Array (Anzahl Empfänger, horizon)
+    """
+    total_obstacles = len(OBSTACLES)
+    x = np.array([r.x for r in receivers], dtype=float)
+    y = np.array([r.y for r in receivers], dtype=float)
+    dist_to_target = np.array([r.distance_to_target for r in receivers], dtype=float)
+    known_obstacles = np.array([r.number_of_known_obstacles for r in receivers], dtype=float)
+    dist = np.maximum(np.sqrt((sender.x - x) ** 2 + (sender.y - y) ** 2), 1.0)    # Distanz zwischen sender und receiver
+
+    # Baseline-Unsicherheit: Distanz zum Ziel (normalisiert auf 0-1), unbekannte Hindernisse, Nähere Rover = höhere Unsicherheit
+    s0 = np.minimum(1.0, np.minimum(1.0, dist_to_target / 200.0)
+                    + (total_obstacles - known_obstacles) / total_obstacles * 0.5
+                    + np.minimum(0.4, 50.0 / dist))
+
+    # Wachstumsrate: Distanz zwischen Rovern, Rover ist weiter weg = mehr Unsicherheit, wenig bekannte Hindernisse = mehr Unsicherheit
+    growth = np.minimum(0.3, 30.0 / dist)
+    growth = growth + np.where(dist_to_target > sender.distance_to_target, 0.2, 0.0)
+    growth = growth + np.where(known_obstacles < total_obstacles * 0.5, 0.2, 0.0)
+    growth = np.maximum(0.1, np.minimum(growth, 0.5))                               # Clamp für Stabilität
+
+    # Lineares Wachstum mit leichtem exponentiellen Faktor
+    k = np.arange(1, horizon + 1)
+    return s0[:, None] + k[None, :] * growth[:, None] + (k * k * 0.01)[None, :]
+
+def plan_aware_comm(sender, comm_candidates, instantiated_rovers, theta=PLACOM_THETA, horizon=PLACOM_HORIZON):
     """
     Plan-Aware Communication (timing-focused) according to "Planning-aware_Communication_for_Decentralised_Multi-Robot_Coordination".
     Idee: Plane den *Zeitpunkt* für Kommunikation. Wähle den Empfänger,
@@ -43,133 +61,36 @@ def plan_aware_comm(sender, comm_candidates, instantiated_rovers, theta=0.3, hor
         horizon: Planungshorizont in Schritten (T>=1)
 
     """
-    import threading, time, math
-
-    if not comm_candidates:
+    if not comm_candidates or horizon < 1:
         return
 
     # Kandidaten-Empfänger (keine Selbstsendung, keine schon fertigen)
-    receivers = [
-        r for r in instantiated_rovers.values()
-        if r is not sender and not getattr(r, "reached_target", False)
-    ]
+    receivers = [r for r in team_state(sender, instantiated_rovers).active_rovers if r is not sender]
     if not receivers:
         return
 
-    # --- Hilfsfunktionen: verbesserte σ̂-Modelle ---
-    def distance_to_rover(r):
-        """Berechnet die Distanz zwischen sender und receiver"""
-        try:
-            dx = sender.x - r.x
-            dy = sender.y - r.y
-            return math.sqrt(dx*dx + dy*dy)
-        except:
-            return 100.0  # Fallback-Distanz
-
-    def baseline_sigma(r):
-        """Berechnet die Baseline-Unsicherheit für einen Rover"""
-        s = 0.0
-        
-        # Basis-Unsicherheit basierend auf Distanz zum Ziel
-        try:
-            dist_to_target = r.distance_to_target
-            s += min(1.0, dist_to_target / 200.0)  # Normalisiert auf 0-1
-        except:
-            s += 0.5
-        
-        # Unsicherheit basierend auf Anzahl bekannter Hindernisse
-        try:
-            known_obstacles = r.number_of_known_obstacles
-            total_obstacles = len(OBSTACLES) if 'OBSTACLES' in globals() else 10
-            s += (total_obstacles - known_obstacles) / total_obstacles * 0.5
-        except:
-            s += 0.3
-        
-        # Unsicherheit basierend auf Distanz zwischen Rovern
-        try:
-            dist = distance_to_rover(r)
-            s += min(0.4, 50.0 / max(dist, 1.0))  # Nähere Rover = höhere Unsicherheit
-        except:
-            s += 0.2
-            
-        return min(1.0, s)  # Clamp auf 0-1
-
-    def sigma_forecast(r, steps):
-        """Prognostiziert die Unsicherheitsentwicklung über die nächsten Schritte"""
-        s0 = baseline_sigma(r)
-        
-        # Wachstumsrate basierend auf verschiedenen Faktoren
-        growth = 0.0
-        
-        # Wachstum basierend auf Distanz zwischen Rovern
-        try:
-            dist = distance_to_rover(r)
-            growth += min(0.3, 30.0 / max(dist, 1.0))
-        except:
-            growth += 0.1
-        
-        # Wachstum basierend auf Bewegung zum Ziel
-        try:
-            if r.distance_to_target > sender.distance_to_target:
-                growth += 0.2  # Rover ist weiter weg = mehr Unsicherheit
-        except:
-            growth += 0.1
-        
-        # Wachstum basierend auf Anzahl bekannter Hindernisse
-        try:
-            known_obstacles = r.number_of_known_obstacles
-            total_obstacles = len(OBSTACLES) if 'OBSTACLES' in globals() else 10
-            if known_obstacles < total_obstacles * 0.5:
-                growth += 0.2  # Wenig bekannte Hindernisse = mehr Unsicherheit
-        except:
-            growth += 0.1
-        
-        growth = max(0.1, min(growth, 0.5))  # Clamp für Stabilität
-        
-        # Lineares Wachstum mit leichtem exponentiellen Faktor
-        return [s0 + k * growth + (k * k * 0.01) for k in range(1, steps + 1)]
-
-    # --- Timing-Entscheidung: frühesten θ-Bruch im Horizont finden ---
-    best = None  # (t_cross, receiver, sigma_path)
-    for r in receivers:
-        seq = sigma_forecast(r, horizon)  # σ̂[1..T]
-        t_cross = None
-        for t, s in enumerate(seq, start=1):
-            if s > float(theta):
-                t_cross = t
-                break
-        if t_cross is not None:
-            if best is None or t_cross < best[0] or (t_cross == best[0] and seq[t_cross-1] > best[2][t_cross-1]):
-                best = (t_cross, r, seq)
-
-    # Falls *kein* Überschreiten von θ in [1..T] prognostiziert: nichts senden (Timing sagt "zu früh")
-    if best is None:
+    # --- Timing-Entscheidung: frühesten θ-Bruch im Horizont finden (alle Empfänger auf einmal) ---
+    sigma = sigma_forecasts(sender, receivers, horizon)                         # σ̂[1..T] pro Empfänger
+    crossed = sigma > float(theta)
+    if not crossed.any():
+        # *Kein* Überschreiten von θ in [1..T] prognostiziert: nichts senden (Timing sagt "zu früh")
         return
+    t_cross = np.where(crossed.any(axis=1), crossed.argmax(axis=1) + 1, horizon + 1)
+    earliest = int(t_cross.min())
 
     # Wenn der früheste Bruch bereits bei t=1 liegt, ist *jetzt* der richtige Zeitpunkt zu senden.
-    t_cross, receiver, _ = best
-    if t_cross > 1:
+    if earliest > 1:
         # Noch nicht fällig -> früh raus (du kannst optional ein "deadline_at" merken)
         return
+    # bei gleichem Zeitpunkt: höchste Unsicherheit, bei Gleichstand der erste Empfänger
+    receiver = receivers[int(np.argmax(np.where(t_cross == earliest, sigma[:, earliest - 1], -np.inf)))]
 
     # --- Senden (punkt-zu-punkt) ---
     comm_candidate = comm_candidates[0]
-    receiver.active_communications += 1
-    threading.Thread(
-        target=delayed_receive_message,
-        args=(receiver, comm_candidate, sender),
-        daemon=True
-    ).start()
+    send_message(receiver, comm_candidate, sender)
 
     # Reaktivierung/Backoff
-    def comm_reactivation(agent):
-        start_time = agent.sim_time
-        while agent.comm_active is False:
-            time.sleep(0.3)
-            if agent.sim_time - start_time >= COMM_DELAY_S:
-                agent.comm_active = True
-                break
-    threading.Thread(target=comm_reactivation, args=(sender,), daemon=True).start()
+    comm_reactivation(sender)
 
     # Konsumierten Kandidaten entfernen
     sender.comm_candidates.pop(0)
@@ -187,26 +108,20 @@ def utility_aware_comm(
         (2) Markov-Annahme: nahezu identische Inhalte stark abwerten
     """
 
-    # Speicher für einfache Markov-Deduplication (Fingerprints) pro Sender
+    # Speicher für einfache Markov-Deduplication (Fingerprints = Integer-Schlüssel des OBSTACLE_INDEX) pro Sender
     if not hasattr(sender, "_last_fingerprints"):
         sender._last_fingerprints = set()
 
+    # Distanzen der Hindernisse zum Ziel (einmal pro Ziel berechnet)
+    target_distances = OBSTACLE_INDEX.distances_to(sender.target_coordinates)
+
     # --- 1) Utility-Skalar ---
     def content_assessment(sender, comm_candidates):
         selected_comm_candidates = []
-        total_distance = sum(
-            instance.distance_to_target
-            for instance in instantiated_rovers.values()
-            if not instance.reached_target
-        )
-        num_instances = sum(
-            1 for instance in instantiated_rovers.values()
-            if not instance.reached_target
-        )
-        avg_distance_to_target = total_distance / num_instances if num_instances != 0 else 0
+        avg_distance_to_target = team_state(sender, instantiated_rovers).mean_distance_to_target
 
         for candidate in comm_candidates:
-            if Polygon(candidate).distance(Point(sender.target_coordinates)) < avg_distance_to_target:
+            if target_distances[candidate] < avg_distance_to_target:
                 selected_comm_candidates.append(candidate)
         return selected_comm_candidates
 
@@ -216,15 +131,13 @@ def utility_aware_comm(
     #     U(c) = 1 / (1 + Distanz(region, target))
     #     Duplikate -> * duplicate_penalty
     scored = []
-    tgt = Point(sender.target_coordinates)
 
     for cand in prelim:
-        poly = Polygon(cand)
-        d = poly.distance(tgt)
+        d = target_distances[cand]
         base_u = 1.0 / (1.0 + d)
 
-        # einfacher Fingerprint für „nahezu identisch“
-        fp = (round(poly.area, 3), round(poly.centroid.x, 2), round(poly.centroid.y, 2))
+        # einfacher Fingerprint für „nahezu identisch“ (gerundete Fläche und Schwerpunkt)
+        fp = OBSTACLE_INDEX.fingerprints[cand]
         u = base_u * (duplicate_penalty if fp in sender._last_fingerprints else 1.0)
 
         scored.append((u, fp, cand))
@@ -240,12 +153,7 @@ def utility_aware_comm(
 
         for receiver_id, receiver in instantiated_rovers.items():
             if receiver != sender and not receiver.reached_target:
-                receiver.active_communications += 1
-                threading.Thread(
-                    target=delayed_receive_message,
-                    args=(receiver, cand, sender),
-                    daemon=True
-                ).start()
+                send_message(receiver, cand, sender)
 
         # Markov-Status aktualisieren & aus Queue entfernen
         sender._last_fingerprints.add(fp)
@@ -273,15 +181,11 @@ def receiver_aware_comm(
     Annahmen:
       - sender/receiver haben .target_coordinates
       - receiver.distance_to_target existiert
-      - delayed_receive_message(receiver, comm_candidate, sender)
+      - send_message(receiver, comm_candidate, sender)
     """
 
     def comm_receiver_assessment(sender, instantiated_rovers):
-        comm_receiver = []
-        for receiver_id, receiver in instantiated_rovers.items():
-            if receiver != sender and not receiver.reached_target and receiver.distance_to_target > sender.distance_to_target:
-                comm_receiver.append(receiver)
-        return comm_receiver
+        return team_state(sender, instantiated_rovers).rovers_farther_than(sender.distance_to_target)
 
     # --- dein bestehender Empfänger-Pool ---
     comm_receiver = comm_receiver_assessment(sender, instantiated_rovers)
@@ -290,24 +194,22 @@ def receiver_aware_comm(
 
     # Hilfsfunktionen
     def _pt(xy, default=(0.0, 0.0)):
-        if xy is None:
-            return Point(default)
         if isinstance(xy, (list, tuple)) and len(xy) == 2:
-            return Point(float(xy[0]), float(xy[1]))
-        return Point(default)
+            return (float(xy[0]), float(xy[1]))
+        return default
 
-    sender_target = _pt(getattr(sender, "target_coordinates", None))
+    # Task-Repräsentation aus Kandidat: Schwerpunkt (leichtgewichtige Proxy), Distanzen zu den Zielen aus dem OBSTACLE_INDEX
+    sender_task_distances = OBSTACLE_INDEX.centroid_distances_to(_pt(getattr(sender, "target_coordinates", None)))
+    receiver_task_distances = [OBSTACLE_INDEX.centroid_distances_to(_pt(getattr(receiver, "target_coordinates", None))) for receiver in comm_receiver]
+    aggregated = {}         # AGGREGATE_MESSAGES: receiver -> obstacles of its message
 
     for comm_candidate in list(comm_candidates):
-        poly = Polygon(comm_candidate)
-        task_pt = poly.centroid  # Task-Repräsentation aus Kandidat (leichtgewichtige Proxy)
-        d_sender_task = sender_target.distance(task_pt)
+        d_sender_task = sender_task_distances[comm_candidate]
 
         # Score-Liste: (Δ_team, receiver, Δ_self)
         scored = []
-        for receiver in comm_receiver:
-            rcv_target = _pt(getattr(receiver, "target_coordinates", None))
-            d_recv_task = rcv_target.distance(task_pt)
+        for receiver, task_distances in zip(comm_receiver, receiver_task_distances):
+            d_recv_task = task_distances[comm_candidate]
 
             # Best-Response: teamweiter Grenznutzen, wenn Info an diesen Empfänger geht
             delta_team = d_sender_task - d_recv_task
@@ -326,88 +228,125 @@ def receiver_aware_comm(
 
         # Broadcast an die ausgewählten Empfänger
         for _, receiver, _ in scored:
-            receiver.active_communications += 1
-            threading.Thread(
-                target=delayed_receive_message,
-                args=(receiver, comm_candidate, sender),
-                daemon=True
-            ).start()
+            if AGGREGATE_MESSAGES:
+                aggregated.setdefault(receiver, []).append(comm_candidate)
+            else:
+                send_message(receiver, comm_candidate, sender)
 
         # Kandidat wurde kommuniziert -> aus Queue entfernen
         try:
             sender.comm_candidates.remove(comm_candidate)
         except ValueError:
             pass 
+
+    for receiver, obstacle_ids in aggregated.items():
+        send_messages(receiver, obstacle_ids, sender)
  
      
 def integrated_comm(sender, comm_candidates, instantiated_rovers):
-    def comm_reactivation(sender):
-        start_time = sender.sim_time
-        # Function to rectivate communication after delay
-        while sender.comm_active == False:  
-            time.sleep(0.3)                 # delay to not update end_time too often, which causes performance issues for larger number of simulated rovers
-            end_time = sender.sim_time
-            if end_time - start_time >= COMM_DELAY_S:
-                sender.comm_active = True
-    
     def team_utility_assessment(sender, comm_candidates):
         selected_comm_candidates = []
-        total_distance = sum(instance.distance_to_target for instance in instantiated_rovers.values() if not instance.reached_target)
-        num_instances = sum(1 for instance in instantiated_rovers.values() if not instance.reached_target)
-        avg_distance_to_target = total_distance / num_instances if num_instances != 0 else 0
+        avg_distance_to_target = team_state(sender, instantiated_rovers).mean_distance_to_target
  
+        target_distances = OBSTACLE_INDEX.distances_to(sender.target_coordinates)
         for candidate in comm_candidates:
-            if Polygon(candidate).distance(Point(sender.target_coordinates)) < avg_distance_to_target:
+            if target_distances[candidate] < avg_distance_to_target:
                 selected_comm_candidates.append(candidate)
         return selected_comm_candidates
     
     def comm_receiver_assessment(sender, instantiated_rovers):
-        comm_receiver = []
-        for receiver_id, receiver in instantiated_rovers.items():
-            #if receiver != sender and not receiver.reached_target and Point(sender.x, sender.y).distance(Point(receiver.x, receiver.y)) > DIST_THRESHOLD:
-            if receiver != sender and not receiver.reached_target and receiver.distance_to_target > sender.distance_to_target:
-                comm_receiver.append(receiver)
-        return comm_receiver
+        # rovers which did not reach the target and are farther away from it than the sender (bisect in the team snapshot)
+        return team_state(sender, instantiated_rovers).rovers_farther_than(sender.distance_to_target)
     
     
     selected_comm_candidates = team_utility_assessment(sender, comm_candidates)
     comm_receiver = comm_receiver_assessment(sender, instantiated_rovers)
     if comm_receiver and selected_comm_candidates:    
-        for comm_candidate in selected_comm_candidates:    
+        if AGGREGATE_MESSAGES:
             for receiver in comm_receiver:
-                receiver.active_communications += 1
-                threading.Thread(target=delayed_receive_message, args=(receiver, comm_candidate, sender)).start()
+                send_messages(receiver, selected_comm_candidates, sender)
+        else:
+            for comm_candidate in selected_comm_candidates:    
+                for receiver in comm_receiver:
+                    send_message(receiver, comm_candidate, sender)
         for comm_candidate in selected_comm_candidates:
             sender.comm_candidates.remove(comm_candidate)           # Clear the item of comm_candidates which was just communicated
-        threading.Thread(target=comm_reactivation, args=(sender,)).start()
+        comm_reactivation(sender)
     else:
         sender.comm_active = True
         
 def full_comm(sender, comm_candidates, instantiated_rovers):
     for receiver_id, receiver in instantiated_rovers.items():
-        for candidate in comm_candidates:    
-            if receiver != sender and not receiver.reached_target:  # Avoid sending message to itself and to rovers that reached the target
-                receiver.active_communications += 1
-                threading.Thread(target=delayed_receive_message, args=(receiver, candidate, sender)).start()
+        if AGGREGATE_MESSAGES:
+            if receiver != sender and not receiver.reached_target:
+                send_messages(receiver, comm_candidates, sender)
+        else:
+            for candidate in comm_candidates:    
+                if receiver != sender and not receiver.reached_target:  # Avoid sending message to itself and to rovers that reached the target
+                    send_message(receiver, candidate, sender)
     sender.comm_candidates = []
  
-def delayed_receive_message(receiver, obstacle, sender):
-    end_of_delay = False
-    start_time = receiver.sim_time
-    # Function to send message with delay
-    delay_ms = random.randint(50, 100)/1000  # Generate random delay between 50 and 100 ms
-    while end_of_delay == False:  
-        time.sleep(0.05)                 # delay to not update end_time too often, which causes performance issues for larger number of simulated rovers
-        end_time = receiver.sim_time
-        if end_time - start_time >= delay_ms:
-            end_of_delay = True
-    
-    # Simulate message loss based on COM_LOSS_RATE
-    if random.random() < COM_LOSS_RATE:
+def send_message(receiver, obstacle_id, sender):
+    """
+    Sends the obstacle (ID = index in OBSTACLES) from sender to receiver. The message is delivered by the event scheduler
+    of the simulation loop after a random delay between 50 and 100 ms of simulated time.
+    """
+    if SKIP_INFORMED_RECEIVERS and receiver.known_obstacles[obstacle_id]:
+        return                              # receiver already knows the obstacle -> no message
+    receiver.active_communications += 1
+    receiver.message_payload += 1
+    delay_s = random.randint(50, 100)/1000  # Generate random delay between 50 and 100 ms
+    if sender.scheduler is None:            # no simulation loop (e.g. stand-alone use) -> deliver without delay
+        delayed_receive_message(receiver, obstacle_id, sender)
+    else:
+        sender.scheduler.schedule_in(delay_s, delayed_receive_message, receiver, obstacle_id, sender)
+
+def send_messages(receiver, obstacle_ids, sender):
+    """
+    Sends several obstacles from sender to receiver in one aggregated message (one delay, one loss draw, one path check
+    of the receiver). The network load counts one message with a payload of len(obstacle_ids) obstacles.
+    """
+    if SKIP_INFORMED_RECEIVERS:
+        obstacle_ids = [obstacle_id for obstacle_id in obstacle_ids if not receiver.known_obstacles[obstacle_id]]
+    if not obstacle_ids:
+        return
+    obstacle_ids = list(obstacle_ids)       # the candidate list of the sender changes before the delivery
+    receiver.active_communications += 1
+    receiver.message_payload += len(obstacle_ids)
+    delay_s = random.randint(50, 100)/1000  # Generate random delay between 50 and 100 ms
+    if sender.scheduler is None:
+        delayed_receive_messages(receiver, obstacle_ids, sender)
+    else:
+        sender.scheduler.schedule_in(delay_s, delayed_receive_messages, receiver, obstacle_ids, sender)
+
+def delayed_receive_message(receiver, obstacle_id, sender):
+    """
+    Delivers a message at the end of its delay (called by the event scheduler)
+    """
+    # Simulate message loss based on the communication loss rate of the sender
+    if random.random() < sender.com_loss_rate:
         # Message is lost - do not deliver it
         return
     
-    if end_of_delay:
-        receiver.receive_message(obstacle, sender)
-        
-   
\ No newline at end of file
+    receiver.receive_message(obstacle_id, sender)
+
+def delayed_receive_messages(receiver, obstacle_ids, sender):
+    """
+    Delivers an aggregated message at the end of its delay (called by the event scheduler)
+    """
+    if random.random() < sender.com_loss_rate:
+        return
+    
+    receiver.receive_messages(obstacle_ids, sender)
+
+def comm_reactivation(sender):
+    """
+    Reactivates the communication of sender after COMM_DELAY_S of simulated time
+    """
+    if sender.scheduler is None:
+        reactivate_comm(sender)
+    else:
+        sender.scheduler.schedule_in(COMM_DELAY_S, reactivate_comm, sender)
+
+def reactivate_comm(sender):
+    sender.comm_active = True
@@ -4,17 +4,68 @@ import pygame
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
+
+# rendered rover IDs (rover ID -> text surface), the font is created at the first use (pygame has to be initialised)
+_GLYPHS = {}
+_GLYPH_FONT = []
   
+def rover_glyph(rover_id):
+    if rover_id not in _GLYPHS:
+        if not _GLYPH_FONT:
+            _GLYPH_FONT.append(pygame.font.Font(None, 20))
+        _GLYPHS[rover_id] = _GLYPH_FONT[0].render(str(rover_id), True, WHITE)
+    return _GLYPHS[rover_id]
+
 def draw_path(vehicle, screen):
     if len(vehicle.move_points) < 1:
         return
-    current_position = (int(vehicle.x), int(vehicle.y))
-    points_to_draw = [current_position] + vehicle.move_points
-    pygame.draw.lines(screen, RED, False, points_to_draw, 2)    
+    points_to_draw = vehicle.move_points.polyline(int(vehicle.x), int(vehicle.y))     # current position + remaining WPs
+    return pygame.draw.lines(screen, RED, False, points_to_draw, 2)    
     
 def draw_rover(rover, screen):
-    pygame.draw.circle(screen, rover.color, (rover.x, rover.y), rover.radius)
-    font = pygame.font.Font(None, 20)
-    text_surface = font.render(str(rover.id), True, WHITE)
-    screen.blit(text_surface, (rover.x - 5, rover.y - 5))
+    rect = pygame.draw.circle(screen, rover.color, (rover.x, rover.y), rover.radius)
+    return rect.union(screen.blit(rover_glyph(rover.id), (rover.x - 5, rover.y - 5)))
+
+
+class Renderer:
+    """
+    Draws the simulation: the obstacles and the target are rendered once onto a background surface, every frame only
+    the areas of the rovers and paths of the previous and the current frame are restored and updated on the screen.
+    """
+
+    def __init__(self, screen, obstacles, target_coordinates, font):
+        self.screen = screen
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill(WHITE)
+        pygame.draw.rect(self.background, BLACK, (target_coordinates[0]-6, target_coordinates[1]-6, 20, 20))
+        self.background.blit(font.render("G", True, WHITE), (target_coordinates[0]-3, target_coordinates[1]-3))
+        for obstacle in obstacles:
+            pygame.draw.polygon(self.background, RED, obstacle)
+        self.dirty_rects = None             # areas drawn in the previous frame, None: the whole screen is redrawn
+
+    def reset(self):
+        """
+        Redraws the whole screen in the next frame (i.e. at the start of a simulation cycle).
+        """
+        self.dirty_rects = None
 
+    def draw(self, rovers):
+        """
+        Draws the rovers with their paths and updates the changed areas of the display.
+        """
+        if self.dirty_rects is None:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                self.screen.blit(self.background, rect, rect)
+        rects = []
+        for rover in rovers:
+            rects.append(draw_rover(rover, self.screen))
+            path_rect = draw_path(rover, self.screen)
+            if path_rect is not None:
+                rects.append(path_rect)
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects + rects)
+        self.dirty_rects = rects
@@ -0,0 +1,90 @@
+from functools import lru_cache
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.errors import GEOSException
+from vehicle.navigation import avoiding_WP_generation
+
+INFLATED_CACHE_SIZE = 4096          # inflated obstacles kept in the cache (least recently used ones are dropped, i.e. merged outlines of past runs)
+
+
+class InflatedObstacle:
+    """
+    Obstacle inflated by a clearance distance: the avoiding WPs at its corners and the (prepared) polygon spanned by them.
+    """
+    __slots__ = ("waypoints", "polygon")
+
+    def __init__(self, waypoints, polygon):
+        self.waypoints = waypoints      # avoiding WPs (avoiding_WP_generation), not filtered by the world limits
+        self.polygon = polygon          # prepared Polygon of the avoiding WPs, None if no polygon can be built
+
+
+@lru_cache(maxsize=INFLATED_CACHE_SIZE)
+def _inflate(corners, min_distance, concave=False):
+    waypoints = avoiding_WP_generation(corners, min_distance, concave)
+    try:
+        polygon = Polygon(waypoints)
+        if not shapely.is_valid(polygon):
+            # self-intersecting WP outline (narrow parts of concave merged outlines): mitred offset of the obstacle,
+            # min_distance * sqrt(0.5) is the clearance of the corner WPs to the edges at right angles (grid based maps)
+            polygon = Polygon(corners).buffer(min_distance * np.sqrt(0.5), join_style="mitre")
+        shapely.prepare(polygon)
+    except (ValueError, GEOSException):
+        polygon = None
+    return InflatedObstacle(waypoints, polygon)
+
+def inflated_obstacle(obstacle, min_distance, concave=False):
+    """
+    Inflated obstacle, cached per obstacle and distance.
+    :param obstacle: The corners of the obstacle [(x1, y1), (x2, y2), ...].
+    :param min_distance: The clearance distance (i.e. MIN_DISTANCE, INITIAL_DISTANCE).
+    :param concave: True for the exact (possibly concave) outlines of WorldModel, see avoiding_WP_generation.
+    :return: InflatedObstacle (shared, must not be modified).
+    """
+    return _inflate(tuple(tuple(corner) for corner in obstacle), min_distance, concave)
+
+
+class InflatedObstacleLayer:
+    """
+    Inflated obstacles of a world model, updated when the world model changes.
+    Path checks are evaluated against all inflated polygons at once.
+    """
+
+    def __init__(self, min_distance):
+        self.min_distance = min_distance
+        self.obstacles = {}             # obstacle (tuple of corners) -> InflatedObstacle
+        self._polygons = None           # array of all inflated polygons (rebuilt after changes)
+        self._invalid = False           # True if an inflated polygon of the world model could not be built
+        self._synced = None             # (world model, version) of the last sync, if the world model has a version (WorldModel)
+
+    def sync(self, world_model):
+        """
+        Updates the layer to the current state of the world model.
+        """
+        version = getattr(world_model, "version", None)
+        if version is not None:
+            if self._synced is not None and self._synced[0] is world_model and self._synced[1] == version:
+                return
+            self._synced = (world_model, version)
+        current = dict.fromkeys(tuple(tuple(corner) for corner in obstacle) for obstacle in world_model)
+        if current.keys() == self.obstacles.keys():
+            return
+        concave = getattr(world_model, "concave", False)
+        self.obstacles = {obstacle: self.obstacles.get(obstacle) or _inflate(obstacle, self.min_distance, concave) for obstacle in current}
+        polygons = [inflated.polygon for inflated in self.obstacles.values()]
+        self._invalid = None in polygons
+        self._polygons = np.array([polygon for polygon in polygons if polygon is not None], dtype=object)
+
+    def intersects(self, geometry):
+        """
+        Checks if the geometry (i.e. the remaining path) intersects any inflated obstacle.
+        Inflated obstacles which cannot be evaluated count as intersecting (as in worldmodel_intersects_path).
+        """
+        if self._invalid:
+            return True
+        if self._polygons is None or not len(self._polygons):
+            return False
+        try:
+            return bool(shapely.intersects(self._polygons, geometry).any())
+        except GEOSException:
+            return True
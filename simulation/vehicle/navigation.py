@@ -1,6 +1,7 @@
 import heapq
 import numpy as np
 from shapely.geometry import LineString, Polygon, Point
+from vehicle.path import Path
 
 def point_inside_world(point, WIDTH, HEIGHT):
     """
@@ -13,16 +14,20 @@ def point_inside_world(point, WIDTH, HEIGHT):
         return True
     return False
 
-def avoiding_WP_generation(geofence_corners, min_distance):
+def avoiding_WP_generation(geofence_corners, min_distance, concave=False):
     """
     Generate one new point at each corner of the geofence so that the point is placed on the bisecting angle.
     :param geofence_corners: The vertices of the geofence as a list of tuples [(x1, y1), (x2, y2), ...].
     :param min_distance: The distance from the geofence corners to the new points.
+    :param concave: True: the points of reflex corners are placed outside the geofence as well (exact outlines of WorldModel),
+                    False: original placement (merged 4 corner entries of the list based world model).
     :return: A list of new points in the format [(x1, y1), (x2, y2), ...].
     """
     new_points = []
 
     num_corners = len(geofence_corners)
+    # orientation of the corners (shoelace formula), reflex corners turn against it
+    orientation = sum(geofence_corners[i - 1][0] * geofence_corners[i][1] - geofence_corners[i][0] * geofence_corners[i - 1][1] for i in range(num_corners))
     for i in range(num_corners):
         # Get the current corner and the previous and next corners to form angle bisector
         current_corner = np.array(geofence_corners[i])
@@ -36,18 +41,24 @@ def avoiding_WP_generation(geofence_corners, min_distance):
         # Calculate the bisecting angle between the two vectors (using exterior angle bisect)
         bisecting_vector = vector_next / np.linalg.norm(vector_next) + vector_previous / np.linalg.norm(vector_previous)
         bisecting_vector /= np.linalg.norm(bisecting_vector)
+        if concave and (vector_previous[0] * vector_next[1] - vector_previous[1] * vector_next[0]) * orientation > 0:
+            bisecting_vector = -bisecting_vector     # reflex corner: the bisector of the neighbours points outwards
         # Compute the new point at a distance of min_distance along the bisecting vector
         new_point = tuple((current_corner - min_distance * bisecting_vector).tolist())
         new_points.append(new_point)
     return new_points
 
-def worldmodel_intersects_path(world_model, move_points, x, y, MIN_DISTANCE):
+def worldmodel_intersects_path(world_model, move_points, x, y, MIN_DISTANCE, inflated_obstacles=None):
     current_position = (x, y)
     if move_points:
-        current_path = LineString([current_position] + move_points)
+        current_path = LineString(move_points.polyline(x, y) if isinstance(move_points, Path) else [current_position] + move_points)
+        if inflated_obstacles is not None:          # cached inflated obstacles of the world model (InflatedObstacleLayer)
+            inflated_obstacles.sync(world_model)
+            return inflated_obstacles.intersects(current_path)
+        concave = getattr(world_model, "concave", False)
         for obstacle in world_model:
             try:
-                obstacle_polygon = Polygon(avoiding_WP_generation(obstacle, MIN_DISTANCE))
+                obstacle_polygon = Polygon(avoiding_WP_generation(obstacle, MIN_DISTANCE, concave))
                 if obstacle_polygon.intersects(current_path):
                     return True
             except Exception as e:
@@ -59,10 +70,23 @@ def worldmodel_intersects_path(world_model, move_points, x, y, MIN_DISTANCE):
     else:
         return False
 
-def perform_navigation(world_model, x, y, target_coordinate, WIDTH, HEIGHT, MIN_DISTANCE):
+def perform_navigation(world_model, x, y, target_coordinate, WIDTH, HEIGHT, MIN_DISTANCE, visibility_graph=None, planner="a_star"):
+    """
+    :param planner: a_star (original planner) or lazy_a_star (faster, the paths can differ, see lazy_a_star).
+    """
+    if planner == "lazy_a_star":
+        search = lazy_a_star
+    elif planner == "a_star":
+        search = a_star
+    else:
+        raise ValueError(f"unknown planner: {planner}")
+    if visibility_graph is not None:
+        visibility_graph.sync(world_model)      # incremental update of the cached avoiding WPs and edges
+        return search((x, y), target_coordinate, list(visibility_graph.nodes), world_model, visibility_graph.is_blocked)
     possible_avoiding_WP =[]
+    concave = getattr(world_model, "concave", False)     # as in VisibilityGraph
     for obstacle in world_model:
-        possible_avoiding_WP.extend(avoiding_WP_generation(obstacle, MIN_DISTANCE))    #possible_avoiding_WP berechnen
+        possible_avoiding_WP.extend(avoiding_WP_generation(obstacle, MIN_DISTANCE, concave))    #possible_avoiding_WP berechnen
     avoiding_WP = []   #list with possible WP, to go around the obstacles
     for point in possible_avoiding_WP:
         if point_inside_world(point, WIDTH, HEIGHT):
@@ -74,10 +98,20 @@ def perform_navigation(world_model, x, y, target_coordinate, WIDTH, HEIGHT, MIN_
                 points_to_remove.append(point) 
     for point in points_to_remove:
         avoiding_WP.remove(point)      #WP that are inside an obstacle of WorldModel are removed
-    move_points = a_star((x, y), target_coordinate, avoiding_WP, world_model) #generate path that avoids the known obstacles (world_model) 
+    move_points = search((x, y), target_coordinate, avoiding_WP, world_model) #generate path that avoids the known obstacles (world_model) 
     return move_points
     
-def a_star(start, goal, list_of_WP, world_model):
+def path_intersects_world_model(a, b, world_model):
+    """
+    Check if the path from a to b intersects any geofence from world_model.
+    """
+    line = LineString([a, b])
+    for geofence in world_model:
+        if line.intersects(Polygon(geofence)):
+            return True
+    return False
+
+def a_star(start, goal, list_of_WP, world_model, is_blocked=None):
     """
     A* algorithm implementation for a graph with geofences.
 
@@ -85,6 +119,7 @@ def a_star(start, goal, list_of_WP, world_model):
     :param goal: The goal node (x, y).
     :param list_of_WP: A list of waypoints (WP), each WP can be reached from any other WP [(x1, y1), (x2, y2), ...].
     :param world_model: A list of geofences where each geofence is defined by its corners.
+    :param is_blocked: Optional function is_blocked(a, b) replacing the intersection check of the path from a to b, i.e. VisibilityGraph.is_blocked.
 
     :return: The resulting path as a list of waypoints including start as first item [(x1, y1), (x2, y2), ...].
     """
@@ -95,16 +130,6 @@ def a_star(start, goal, list_of_WP, world_model):
         """
         return np.sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2)
 
-    def path_intersects_world_model(a, b, world_model):
-        """
-        Check if the path from a to b intersects any geofence from world_model.
-        """
-        line = LineString([a, b])
-        for geofence in world_model:
-            if line.intersects(Polygon(geofence)):
-                return True
-        return False
-
     def reconstruct_path(came_from, current):
         """
         Reconstruct the path from the start node to the current node.
@@ -115,6 +140,9 @@ def a_star(start, goal, list_of_WP, world_model):
             total_path.insert(0, current)
         return total_path[1:]
 
+    if is_blocked is None:
+        is_blocked = lambda a, b: path_intersects_world_model(a, b, world_model)
+
     open_set = []
     heapq.heappush(open_set, (0, start))
 
@@ -134,7 +162,7 @@ def a_star(start, goal, list_of_WP, world_model):
             return path  # Return the reconstructed path
 
         for neighbor in all_nodes:
-            if neighbor == current or path_intersects_world_model(current, neighbor, world_model):
+            if neighbor == current or is_blocked(current, neighbor):
                 continue
 
             tentative_g_score = g_score[current] + heuristic(current, neighbor)
@@ -148,8 +176,63 @@ def a_star(start, goal, list_of_WP, world_model):
 
     return []  # Return an empty list if no path is found
 
+def lazy_a_star(start, goal, list_of_WP, world_model, is_blocked=None):
+    """
+    A* variant of a_star with a closed set and lazy edge evaluation (same parameters and return value).
+    The distances from an expanded node to all nodes are computed at once, the (expensive) intersection check
+    is only performed for edges which would improve the g_score of their end node. Outdated open set entries
+    are skipped when popped instead of searching the open set.
+    The paths can differ from a_star: a_star keeps the first open set entry of a node when its g_score improves
+    (no decrease-key) and may expand nodes again, lazy_a_star expands every node once with its best g_score,
+    so for equally long alternatives or after improved g_scores another (possibly shorter) path is returned.
+
+    :return: The resulting path as a list of waypoints excluding start [(x1, y1), (x2, y2), ...].
+    """
+    if is_blocked is None:
+        is_blocked = lambda a, b: path_intersects_world_model(a, b, world_model)
+
+    nodes = sorted(set(list_of_WP) | {start, goal})
+    start_index = nodes.index(start)
+    goal_index = nodes.index(goal)
+    coordinates = np.array(nodes, dtype=float)
+    xs = coordinates[:, 0]
+    ys = coordinates[:, 1]
+    heuristic = np.sqrt((xs - goal[0])**2 + (ys - goal[1])**2)
+
+    g_score = np.full(len(nodes), np.inf)
+    g_score[start_index] = 0
+    closed = np.zeros(len(nodes), dtype=bool)
+    came_from = {}
+
+    open_set = [(heuristic[start_index], start_index)]
+    while open_set:
+        current = heapq.heappop(open_set)[1]
+        if closed[current]:
+            continue    # outdated entry, node was already expanded
+
+        if current == goal_index:
+            path = []
+            while current in came_from:
+                path.insert(0, nodes[current])
+                current = came_from[current]
+            return path
+        closed[current] = True
+
+        tentative_g_score = g_score[current] + np.sqrt((xs - xs[current])**2 + (ys - ys[current])**2)
+        for neighbor in np.flatnonzero((tentative_g_score < g_score) & ~closed).tolist():
+            if is_blocked(nodes[current], nodes[neighbor]):
+                continue
+            came_from[neighbor] = current
+            g_score[neighbor] = tentative_g_score[neighbor]
+            heapq.heappush(open_set, (tentative_g_score[neighbor] + heuristic[neighbor], neighbor))
+
+    return []  # Return an empty list if no path is found
+
 def distance_to_target(move_points, x, y):
     total_distance = 0
+    
+    if isinstance(move_points, Path):       # cached length behind the current WP
+        return move_points.length_from(x, y)
             
     if not move_points:
         return total_distance
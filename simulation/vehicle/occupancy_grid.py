@@ -0,0 +1,70 @@
+import numpy as np
+
+
+CELL_SIZE = 10                      # edge length of a map cell (map_generator: one obstacle per cell)
+
+
+class OccupancyGrid:
+    """
+    Grid of the known map cells of one rover, kept alongside the (merged) polygons of its world model.
+    The obstacles of the map are axis-aligned cells, so containment and overlap queries are array lookups
+    instead of polygon unions. The label grid stores for every known cell the index of the world model
+    entry it was merged into.
+    """
+
+    def __init__(self, WIDTH, HEIGHT, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.rows = -(-HEIGHT // cell_size)
+        self.columns = -(-WIDTH // cell_size)
+        self.known = np.zeros((self.rows, self.columns), dtype=bool)        # True: cell is part of a known obstacle
+        self.labels = np.full((self.rows, self.columns), -1, dtype=np.int32) # index of the world model entry per cell, -1 = free
+        self.number_of_known_cells = 0
+
+    def copy(self):
+        grid = OccupancyGrid.__new__(OccupancyGrid)
+        grid.__dict__.update(self.__dict__)
+        grid.known = self.known.copy()
+        grid.labels = self.labels.copy()
+        return grid
+
+    def cells(self, obstacle):
+        """
+        :return: row and column range (start, stop) of the cells covered by the bounding box of the obstacle.
+        """
+        xs = [corner[0] for corner in obstacle]
+        ys = [corner[1] for corner in obstacle]
+        size = self.cell_size
+        row_start, column_start = max(int(min(ys) // size), 0), max(int(min(xs) // size), 0)
+        row_stop, column_stop = min(-int(-max(ys) // size), self.rows), min(-int(-max(xs) // size), self.columns)
+        return row_start, max(row_stop, row_start + 1), column_start, max(column_stop, column_start + 1)
+
+    def contains(self, obstacle):
+        """
+        Checks if all cells of the obstacle are known.
+        """
+        row_start, row_stop, column_start, column_stop = self.cells(obstacle)
+        if row_stop - row_start == 1 and column_stop - column_start == 1:
+            return bool(self.known[row_start, column_start])
+        return bool(self.known[row_start:row_stop, column_start:column_stop].all())
+
+    def overlap_index(self, obstacle):
+        """
+        Index of the first world model entry which shares a cell or a cell edge with the obstacle
+        (cells touching only at a corner do not overlap, as their union is no single polygon).
+        :return: The index or None.
+        """
+        row_start, row_stop, column_start, column_stop = self.cells(obstacle)
+        vertical = self.labels[max(row_start - 1, 0):row_stop + 1, column_start:column_stop]
+        horizontal = self.labels[row_start:row_stop, max(column_start - 1, 0):column_stop + 1]
+        labels = np.concatenate((vertical.ravel(), horizontal.ravel()))
+        labels = labels[labels >= 0]
+        return int(labels.min()) if labels.size else None
+
+    def add(self, obstacle, index):
+        """
+        Marks the cells of the obstacle as known and part of the world model entry index.
+        """
+        row_start, row_stop, column_start, column_stop = self.cells(obstacle)
+        self.number_of_known_cells += int((~self.known[row_start:row_stop, column_start:column_stop]).sum())
+        self.known[row_start:row_stop, column_start:column_stop] = True
+        self.labels[row_start:row_stop, column_start:column_stop] = index
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class Path:
+    """
+    WPs of a rover (move_points) with the cached path length behind every WP.
+    Behaves like the list of WPs it replaces (len, indexing, iteration, pop(0)), but passing a WP only increments
+    the index of the current WP and the remaining distance is available in constant time.
+    """
+
+    def __init__(self, points=()):
+        self.points = [tuple(point) for point in points]
+        self.start = 0                                                      # index of the current WP
+        # path length from WP i to the last WP
+        self.length_after = [0.0] * len(self.points)
+        for i in range(len(self.points) - 2, -1, -1):
+            (x1, y1), (x2, y2) = self.points[i], self.points[i + 1]
+            self.length_after[i] = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5 + self.length_after[i + 1]
+        # polyline buffer for drawing and intersection checks: row i is free for the current position, row i+1 is WP i
+        self.buffer = np.empty((len(self.points) + 1, 2))
+        if self.points:
+            self.buffer[1:] = self.points
+
+    def __len__(self):
+        return len(self.points) - self.start
+
+    def __bool__(self):
+        return self.start < len(self.points)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.points[self.start:][index]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        return self.points[self.start + index]
+
+    def __iter__(self):
+        return iter(self.points[self.start:])
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"Path({list(self)})"
+
+    def pop(self, index=0):
+        """
+        Removes the current WP (only the first WP can be removed).
+        """
+        if index != 0:
+            raise ValueError("only the current WP can be removed from a path")
+        if not self:
+            raise IndexError("pop from empty path")
+        self.start += 1
+        return self.points[self.start - 1]
+
+    def remaining_length(self):
+        """
+        :return: path length from the current WP to the last WP.
+        """
+        return self.length_after[self.start] if self else 0
+
+    def length_from(self, x, y):
+        """
+        :return: distance from position (x, y) to the target following all remaining WPs (navigation.distance_to_target).
+        """
+        if not self:
+            return 0
+        waypoint_x, waypoint_y = self.points[self.start]
+        return ((x - waypoint_x) ** 2 + (y - waypoint_y) ** 2) ** 0.5 + self.length_after[self.start]
+
+    def polyline(self, x, y):
+        """
+        :return: array view with the position (x, y) followed by the remaining WPs (no copy of the WPs).
+        """
+        self.buffer[self.start] = x, y
+        return self.buffer[self.start:]
@@ -1,43 +1,107 @@
-from world.obstacles import OBSTACLES
+from world.obstacle_map import OBSTACLES
+from world.obstacle_index import OBSTACLE_INDEX
 import random
-from shapely import Polygon, Point
+import numpy as np
 from vehicle.communication import *
 from vehicle.navigation import *
 from vehicle.world_model import *
+from vehicle.visibility_graph import VisibilityGraph
+from vehicle.occupancy_grid import OccupancyGrid
+from vehicle.path import Path
+from vehicle.inflated_obstacles import InflatedObstacleLayer
+from vehicle.team_state import TeamState
+from constants import WORLD_MODEL_BACKEND, PLANNER, COM_LOSS_RATE, PLACOM_THETA, PLACOM_HORIZON
  
  
 MIN_DISTANCE = 15                   # minimal distance for an avoiding WP around an obstacle for Rovers
 SPEED = 0.2                         # move speed: 0.1 == 1 m/s == 3,6km/h
 MAX_MEMORY_COMM_CANDIDATES = 3      # memory limit for comm_candidates
+SENSOR_RANGE = 25                   # radius of the sensor range of Rovers
+COMM_TYPES = ("NoCom", "PlaCom", "UtiCom", "RecCom", "IntCom", "FulCom")
  
  
+class FleetAttribute:
+    """
+    Attribute of a FleetRover which is stored in the arrays of its RoverFleet.
+    Shared attributes are stored once per fleet (i.e. the simulation time).
+    """
+    def __init__(self, shared=False):
+        self.shared = shared
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, rover, owner=None):
+        if rover is None:
+            return self
+        if self.shared:
+            return getattr(rover.fleet, self.name)
+        return getattr(rover.fleet, self.name).item(rover.slot)
+
+    def __set__(self, rover, value):
+        if self.shared:
+            setattr(rover.fleet, self.name, value)
+        else:
+            getattr(rover.fleet, self.name)[rover.slot] = value
+
+
+class FleetPath:
+    """
+    move_points of a rover, assigned lists of WPs are stored as Path, assigning a new path notifies the fleet of the rover.
+    There is no __get__, so reading move_points is a plain lookup in the instance dict.
+    """
+    def __set__(self, rover, value):
+        rover.__dict__["move_points"] = value if isinstance(value, Path) else Path(value)
+        if rover.fleet is not None:
+            rover.fleet.path_changed(rover.slot)
+
+
 # definition of class Rover
 class Rover:
     instantiated_rovers = {}
+    team_state = TeamState(instantiated_rovers)                                                 # snapshot of the team for the communication strategies
+    
+    move_points = FleetPath()
+    fleet = None                                                                                # RoverFleet the rover is part of
+    slot = None                                                                                 # index of the rover in the arrays of the fleet
     
-    def __init__(self, id, start_position, target_coordinates, WIDTH, HEIGHT, COMM_TYPE, sim_time):
+    def __init__(self, id, start_position, target_coordinates, WIDTH, HEIGHT, COMM_TYPE, sim_time, scheduler=None, com_loss_rate=COM_LOSS_RATE,
+                 placom_theta=PLACOM_THETA, placom_horizon=PLACOM_HORIZON):
         self.id = id
         self.x, self.y = start_position
         self.target_coordinates = target_coordinates                                            # mission definition: reaching the target
         self.WIDTH = WIDTH
         self.HEIGHT = HEIGHT
+        if COMM_TYPE not in COMM_TYPES:
+            raise ValueError(f"unknown comm type: {COMM_TYPE}")
         self.comm_type = COMM_TYPE
+        self.com_loss_rate = com_loss_rate                                                      # probability that a message sent by the rover is lost
+        self.placom_theta = placom_theta                                                        # PlaCom: uncertainty threshold θ
+        self.placom_horizon = placom_horizon                                                    # PlaCom: forecast horizon in steps
+        self.speed = SPEED                                                                      # distance per simulation step
         self.radius = 10                                                                        # radius for drawing
         self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))   # colour for drawing
-        self.world_model = []                                                                   # internal world model of the rover including obstacles
+        self.world_model = WorldModel() if WORLD_MODEL_BACKEND == "indexed" else []             # internal world model of the rover including obstacles
+        self.occupancy_grid = OccupancyGrid(WIDTH, HEIGHT) if WORLD_MODEL_BACKEND == "grid" else None  # known cells of the world model (constant time containment and overlap checks)
         self.avoiding_WP = []                                                                   # possible WP to avoid obstacles
+        self.visibility_graph = VisibilityGraph(WIDTH, HEIGHT, MIN_DISTANCE)                    # cached avoiding WPs and edges of the world model for navigation
+        self.inflated_obstacles = InflatedObstacleLayer(MIN_DISTANCE)                           # cached inflated obstacles of the world model for path checks
         self.move_points = [target_coordinates]                                                 # list of WP that will be used to reach target (initialized with target_coordinat)
-        self.comm_candidates = []                                                               # list of candidates that could be communicated when possible
+        self.comm_candidates = []                                                               # list of candidates (obstacle IDs) that could be communicated when possible
+        self.known_obstacles = np.zeros(len(OBSTACLES), dtype=bool)                             # known obstacle IDs (index in OBSTACLES), checked before any geometry
         self.comm_active = True                                                                 # parameter to indicate, if communication is possible at the requested time (only relevant for some communication paradigms)
         Rover.instantiated_rovers[self.id] = self                                               # team registration
+        Rover.team_state.invalidate()
         self.counted = False                                                                    # relevant for counting the rovers, which reached the target
         self.reached_target = False                                                             # relevant for counting the rovers, which reached the target
         self.useful_comms = 0                                                                   # relevant for counting usefull communications
         self.not_useful_comms = 0                                                               # relevant for counting not usefull communications
         self.moved_distance = 0                                                                 # distance moved by the rover in meter [m]
         self.sim_time = sim_time                                                                # internal simulation time
+        self.scheduler = scheduler                                                              # event scheduler of the simulation loop (message delivery, comm reactivation)
         self.elapsed_time_to_target = 0                                                         # elapsed time until target reached [s]
         self.active_communications = 0                                                          # number of communications currently in the network
+        self.message_payload = 0                                                                # number of obstacles in these communications
         self.number_of_known_obstacles = 0                                                      # relevant for evaluation of Environmental Awareness Ratio
         self.distance_to_target = distance_to_target(self.move_points, self.x, self.y)          # distance to target following all move_points
         
@@ -48,7 +112,7 @@ class Rover:
                 current_target_x, current_target_y = self.move_points[0]
             # handling of unlikely error event
             else:
-                self.move_points = perform_navigation(self.world_model, self.x, self.y, self.target_coordinates, self.WIDTH, self.HEIGHT, MIN_DISTANCE)
+                self.replan()
                 current_target_x, current_target_y = self.move_points[0]
             #heading to target
             dx = current_target_x - self.x
@@ -62,46 +126,57 @@ class Rover:
  
             #WP management
             if distance_next_WP <= 1:  
-                self.x = current_target_x
-                self.y = current_target_y
-                self.move_points.pop(0)  
-                if not self.move_points and self.distance_to_target <= 1:
-                    self.reached_target = True
-                else:
-                    self.move_points = perform_navigation(self.world_model, self.x, self.y, self.target_coordinates, self.WIDTH, self.HEIGHT, MIN_DISTANCE)                     # setting back to target, in case of error
+                self.arrive_at_waypoint(current_target_x, current_target_y)
             else:
                 # moving the rover
-                self.x += dx / distance_next_WP * SPEED
-                self.y += dy / distance_next_WP * SPEED
-                self.moved_distance += ((((dx / distance_next_WP * SPEED) ** 2) + ((dy / distance_next_WP * SPEED) ** 2)) ** 0.5)/10    # /10 as 10units in the world = 1m
+                self.x += dx / distance_next_WP * self.speed
+                self.y += dy / distance_next_WP * self.speed
+                self.moved_distance += ((((dx / distance_next_WP * self.speed) ** 2) + ((dy / distance_next_WP * self.speed) ** 2)) ** 0.5)/10    # /10 as 10units in the world = 1m
+                old_distance = self.distance_to_target
                 self.distance_to_target = distance_to_target(self.move_points, self.x, self.y)
+                self.team_state.moved(self, old_distance)
+    
+    def arrive_at_waypoint(self, waypoint_x, waypoint_y):
+        self.x = waypoint_x
+        self.y = waypoint_y
+        self.move_points.pop(0)  
+        if not self.move_points and self.distance_to_target <= 1:
+            self.reached_target = True
+            self.team_state.invalidate()
+        else:
+            self.replan()                     # setting back to target, in case of error
+    
+    def replan(self):
+        self.move_points = perform_navigation(self.world_model, self.x, self.y, self.target_coordinates, self.WIDTH, self.HEIGHT, MIN_DISTANCE, self.visibility_graph, PLANNER)
                        
-    def obstacle_detection(self):
-        detection_range = Point(self.x, self.y).buffer(25)                              #sensor range
- 
-        #check if obstacles are in sensor range
-        for obstacle in OBSTACLES:
-            if detection_range.intersects(Polygon(obstacle)) and not obstacle_in_world_model(obstacle, self.world_model): #detection of unknown obstacle
+    def obstacle_detection(self, obstacles_in_range=None):
+        #check if obstacles are in sensor range (spatial index query of the static obstacles, unless already queried by the fleet)
+        if obstacles_in_range is None:
+            obstacles_in_range = OBSTACLE_INDEX.query_range(self.x, self.y, SENSOR_RANGE)
+        for obstacle_index in obstacles_in_range:
+            if not self.obstacle_known(obstacle_index): #detection of unknown obstacle
+                obstacle = OBSTACLES[obstacle_index]
                 
                 # update of world model
                 self.number_of_known_obstacles += 1
+                self.known_obstacles[obstacle_index] = True
                 if len(self.comm_candidates) >= MAX_MEMORY_COMM_CANDIDATES:         # ensuring max length of comm_candidate
                     self.comm_candidates.pop(0)                                     # removal of first element (FIFO)
-                self.comm_candidates.append(obstacle)
-                world_model_update(obstacle, self.world_model)
+                self.comm_candidates.append(obstacle_index)
+                world_model_update(obstacle, self.world_model, self.occupancy_grid)
                 
                 # update of navigation if detected obstacle intersects with current path
-                if worldmodel_intersects_path(self.world_model, self.move_points, self.x, self.y, MIN_DISTANCE):
-                    self.move_points = perform_navigation(self.world_model, self.x, self.y, self.target_coordinates, self.WIDTH, self.HEIGHT, MIN_DISTANCE)                                                    
+                if worldmodel_intersects_path(self.world_model, self.move_points, self.x, self.y, MIN_DISTANCE, self.inflated_obstacles):
+                    self.replan()                                                    
                 
     def communication(self):            
         # perform communication
-        if self.comm_type == "No_Comm":
+        if self.comm_type == "NoCom":
             no_comm()
         elif self.comm_type == "PlaCom":
             if self.comm_active and self.comm_candidates:
                 self.comm_active = False
-                plan_aware_comm(self, self.comm_candidates, self.instantiated_rovers)
+                plan_aware_comm(self, self.comm_candidates, self.instantiated_rovers, self.placom_theta, self.placom_horizon)
         elif self.comm_type == "UtiCom":
             if self.comm_candidates:
                 utility_aware_comm(self, self.comm_candidates, self.instantiated_rovers)
@@ -112,26 +187,69 @@ class Rover:
             if self.comm_active and self.comm_candidates:
                 self.comm_active = False
                 integrated_comm(self, self.comm_candidates, self.instantiated_rovers)
-        else:
+        elif self.comm_type == "FulCom":
             if self.comm_candidates:
                 full_comm(self, self.comm_candidates, self.instantiated_rovers)
                                          
                 
-    def receive_message(self, obstacle, sender):
+    def obstacle_known(self, obstacle_id):
+        # known ID -> no geometry check, otherwise the obstacle may still be covered by a (merged) obstacle of the world model
+        if not self.known_obstacles[obstacle_id] and obstacle_in_world_model(OBSTACLES[obstacle_id], self.world_model, self.occupancy_grid):
+            self.known_obstacles[obstacle_id] = True
+        return self.known_obstacles[obstacle_id]
+                
+    def receive_message(self, obstacle_id, sender):
         if not self.reached_target:                                 # only receive data if target not reached
-            if obstacle_in_world_model(obstacle, self.world_model): #reception of already known obstacle
+            if self.obstacle_known(obstacle_id):                    #reception of already known obstacle
                 self.not_useful_comms += 1
             else:                                                   #reception of unknown obstacle
+                obstacle = OBSTACLES[obstacle_id]
                 # update of world model
                 self.number_of_known_obstacles += 1
-                world_model_update(obstacle, self.world_model)
+                self.known_obstacles[obstacle_id] = True
+                world_model_update(obstacle, self.world_model, self.occupancy_grid)
  
                 # update of navigation if percepted obstacle intersects with current path
-                if worldmodel_intersects_path(self.world_model, self.move_points, self.x, self.y, MIN_DISTANCE):   
-                    self.move_points = perform_navigation(self.world_model, self.x, self.y, self.target_coordinates, self.WIDTH, self.HEIGHT, MIN_DISTANCE)
+                if worldmodel_intersects_path(self.world_model, self.move_points, self.x, self.y, MIN_DISTANCE, self.inflated_obstacles):   
+                    self.replan()
                     self.useful_comms += 1
                 else:  # not usefull communication
                     self.not_useful_comms += 1
         else:
-            self.not_useful_comms += 1  
-            
\ No newline at end of file
+            self.not_useful_comms += 1
+
+    def receive_messages(self, obstacle_ids, sender):
+        # reception of an aggregated message: all obstacles are added to the world model, at most one path check and replan
+        if self.reached_target:                                     # only receive data if target not reached
+            self.not_useful_comms += len(obstacle_ids)
+            return
+        new_obstacles = 0
+        for obstacle_id in obstacle_ids:
+            if self.obstacle_known(obstacle_id):                    #reception of already known obstacle
+                self.not_useful_comms += 1
+            else:                                                   #reception of unknown obstacle
+                self.number_of_known_obstacles += 1
+                self.known_obstacles[obstacle_id] = True
+                world_model_update(OBSTACLES[obstacle_id], self.world_model, self.occupancy_grid)
+                new_obstacles += 1
+        if new_obstacles:
+            # update of navigation if the percepted obstacles intersect with current path (all new obstacles count as useful)
+            if worldmodel_intersects_path(self.world_model, self.move_points, self.x, self.y, MIN_DISTANCE, self.inflated_obstacles):
+                self.replan()
+                self.useful_comms += new_obstacles
+            else:  # not usefull communication
+                self.not_useful_comms += new_obstacles  
+            
+
+
+class FleetRover(Rover):
+    """
+    Rover which is part of a RoverFleet (the class of a rover is switched when it joins the fleet): the kinematic state
+    is stored in the arrays of the fleet. Plain Rovers keep it in ordinary attributes, so per_rover kinematics does
+    not pay for the descriptors.
+    """
+    x = FleetAttribute()
+    y = FleetAttribute()
+    distance_to_target = FleetAttribute()
+    moved_distance = FleetAttribute()
+    sim_time = FleetAttribute(shared=True)
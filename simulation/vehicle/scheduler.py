@@ -0,0 +1,59 @@
+import heapq
+import itertools
+
+TIME_TOLERANCE = 1e-9               # tolerance for comparing accumulated float simulation times
+
+
+class EventScheduler:
+    """
+    Discrete-event scheduler working on simulated time.
+    The scheduler is owned by the simulation loop, which calls run_until() once per simulation step.
+    Events are executed in order of their timestamp, events with equal timestamps in order of scheduling.
+    """
+
+    def __init__(self, start_time=0):
+        self.now = start_time                       # current simulated time [s]
+        self._queue = []                            # heap of (time, sequence number, callback, args)
+        self._sequence = itertools.count()          # tie breaker -> deterministic order of simultaneous events
+        self.scheduled = 0                          # number of scheduled events
+        self.executed = 0                           # number of executed events
+
+    def __len__(self):
+        return len(self._queue)
+
+    def schedule_at(self, time, callback, *args):
+        """
+        Schedules callback(*args) at the absolute simulated time.
+        """
+        heapq.heappush(self._queue, (time, next(self._sequence), callback, args))
+        self.scheduled += 1
+
+    def schedule_in(self, delay, callback, *args):
+        """
+        Schedules callback(*args) after a delay in simulated seconds, measured from the current simulated time.
+        """
+        self.schedule_at(self.now + delay, callback, *args)
+
+    def next_event_time(self):
+        """
+        :return: the timestamp of the next pending event, None if there is no pending event.
+        """
+        return self._queue[0][0] if self._queue else None
+
+    def run_until(self, time):
+        """
+        Executes all events with a timestamp <= time (including events scheduled by executed events) and advances the clock to time.
+        """
+        queue = self._queue
+        while queue and queue[0][0] <= time + TIME_TOLERANCE:
+            event_time, _, callback, args = heapq.heappop(queue)
+            self.now = max(self.now, event_time)
+            self.executed += 1
+            callback(*args)
+        self.now = max(self.now, time)
+
+    def clear(self):
+        """
+        Discards all pending events.
+        """
+        self._queue.clear()
@@ -0,0 +1,82 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+class TeamState:
+    """
+    Snapshot of the team shared by the communication strategies: the rovers which did not reach the target, their
+    mean distance to the target and the rovers sorted by distance_to_target.
+    The snapshot is rebuilt on the first query after invalidate(), which is called when a rover reached the target and
+    after a step of the fleet, so all senders of a simulation step share one snapshot instead of scanning the team.
+    A single rover which moved (per_rover kinematics) is only moved within the sorted order (moved()).
+    """
+
+    def __init__(self, rovers):
+        self.rovers = rovers                # dict rover ID -> rover (Rover.instantiated_rovers)
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def moved(self, rover, old_distance):
+        """
+        Updates the snapshot after the distance_to_target of an active rover changed from old_distance.
+        The rover is moved within the sorted order (bisect), the sum of the distances is recomputed on the next query.
+        """
+        if not self.valid:
+            return
+        index = self._indices.get(rover.id)
+        if index is None:
+            self.invalidate()
+            return
+        del self._sorted[bisect_left(self._sorted, (old_distance, index))]
+        insort(self._sorted, (rover.distance_to_target, index))
+        self._total_valid = False
+
+    def _update(self):
+        self.active = [rover for rover in self.rovers.values() if not rover.reached_target]   # in team order
+        self._indices = {rover.id: index for index, rover in enumerate(self.active)}
+        self._sorted = sorted((rover.distance_to_target, index) for index, rover in enumerate(self.active))   # (distance, index in active)
+        self._total_valid = False
+        self.valid = True
+
+    @property
+    def active_rovers(self):
+        """
+        :return: The rovers which did not reach the target (in team order).
+        """
+        if not self.valid:
+            self._update()
+        return self.active
+
+    @property
+    def active_count(self):
+        return len(self.active_rovers)
+
+    @property
+    def mean_distance_to_target(self):
+        """
+        :return: The mean distance_to_target of the rovers which did not reach the target, 0 if there is none.
+        """
+        active = self.active_rovers
+        if not self._total_valid:
+            self.total_distance_to_target = sum(rover.distance_to_target for rover in active)
+            self._total_valid = True
+        return self.total_distance_to_target / len(active) if active else 0
+
+    def rovers_farther_than(self, distance):
+        """
+        :return: The rovers which did not reach the target with distance_to_target > distance (in team order).
+        """
+        active = self.active_rovers
+        start = bisect_right(self._sorted, (distance, len(active)))
+        return [active[index] for index in sorted(index for _, index in self._sorted[start:])]
+
+
+def team_state(sender, instantiated_rovers):
+    """
+    :return: The shared TeamState of the sender's team, a new snapshot if instantiated_rovers is another team (i.e. a copy).
+    """
+    state = getattr(sender, "team_state", None)
+    if state is None or state.rovers is not instantiated_rovers:
+        state = TeamState(instantiated_rovers)
+    return state
@@ -0,0 +1,127 @@
+import shapely
+from shapely.geometry import LineString, Polygon
+from vehicle.navigation import point_inside_world
+from vehicle.inflated_obstacles import inflated_obstacle
+
+
+class VisibilityGraph:
+    """
+    Visibility graph over the avoiding WPs of a world model, maintained incrementally.
+    sync() only processes the obstacles which were added to or removed (merged) from the world model since the last call:
+    new avoiding WPs are added as nodes, WPs inside a new obstacle are removed and only the cached edges crossing the
+    changed obstacle are invalidated. Connections of the start position are evaluated per search.
+    """
+
+    def __init__(self, WIDTH, HEIGHT, min_distance):
+        self.WIDTH = WIDTH
+        self.HEIGHT = HEIGHT
+        self.min_distance = min_distance
+        self.polygons = {}          # obstacle (tuple of corners) -> prepared Polygon of the obstacle
+        self.candidates = {}        # obstacle -> avoiding WPs of the obstacle inside the world
+        self.nodes = set()          # avoiding WPs which are not inside any obstacle of the world model
+        self.edges = {}             # node -> {node: True if the connection is blocked by an obstacle}
+        self._polygon_array = None  # all obstacle polygons for vectorized predicates (rebuilt after changes)
+        self._synced = None         # (world model, version) of the last sync, if the world model has a version (WorldModel)
+        self.concave = False        # True if the entries of the world model can be concave (WorldModel)
+
+    def sync(self, world_model):
+        """
+        Updates the graph to the current state of the world model.
+        """
+        version = getattr(world_model, "version", None)
+        if version is not None:
+            if self._synced is not None and self._synced[0] is world_model and self._synced[1] == version:
+                return
+            self._synced = (world_model, version)
+        self.concave = getattr(world_model, "concave", False)
+        current = dict.fromkeys(tuple(tuple(corner) for corner in obstacle) for obstacle in world_model)
+        removed = [obstacle for obstacle in self.polygons if obstacle not in current]
+        added = [obstacle for obstacle in current if obstacle not in self.polygons]
+        for obstacle in removed:
+            self._remove_obstacle(obstacle)
+        for obstacle in added:
+            self._add_obstacle(obstacle)
+
+    def is_blocked(self, a, b):
+        """
+        Checks if the path from a to b intersects any obstacle of the world model (cached for connections between nodes).
+        """
+        if a in self.nodes and b in self.nodes:
+            blocked = self.edges[a].get(b)
+            if blocked is None:
+                blocked = self._intersects_obstacle(a, b)
+                self.edges[a][b] = blocked
+                self.edges[b][a] = blocked
+            return blocked
+        return self._intersects_obstacle(a, b)
+
+    def _intersects_obstacle(self, a, b):
+        if not self.polygons:
+            return False
+        if self._polygon_array is None:
+            self._polygon_array = list(self.polygons.values())
+        return bool(shapely.intersects(self._polygon_array, LineString([a, b])).any())
+
+    def _inside_obstacle(self, point):
+        return any(shapely.contains_xy(polygon, *point) for polygon in self.polygons.values())
+
+    def _add_node(self, point):
+        if point not in self.nodes:
+            self.nodes.add(point)
+            self.edges[point] = {}
+
+    def _remove_node(self, point):
+        if point in self.nodes:
+            self.nodes.remove(point)
+            for neighbor in self.edges.pop(point):
+                self.edges[neighbor].pop(point, None)
+
+    def _cached_edges(self, blocked):
+        return [(a, b) for a, neighbors in self.edges.items() for b, state in neighbors.items() if state == blocked and a < b]
+
+    def _add_obstacle(self, obstacle):
+        polygon = Polygon(obstacle)
+        shapely.prepare(polygon)
+
+        # nodes inside the new obstacle are no longer valid
+        for point in [point for point in self.nodes if shapely.contains_xy(polygon, *point)]:
+            self._remove_node(point)
+
+        # free edges crossing the new obstacle are blocked now
+        free_edges = self._cached_edges(False)
+        if free_edges:
+            crossing = shapely.intersects(polygon, shapely.linestrings(free_edges))
+            for (a, b), is_crossing in zip(free_edges, crossing):
+                if is_crossing:
+                    self.edges[a][b] = True
+                    self.edges[b][a] = True
+
+        self.polygons[obstacle] = polygon
+        self._polygon_array = None
+
+        # new avoiding WPs which are inside the world and not inside any obstacle
+        self.candidates[obstacle] = [point for point in inflated_obstacle(obstacle, self.min_distance, self.concave).waypoints if point_inside_world(point, self.WIDTH, self.HEIGHT)]
+        for point in self.candidates[obstacle]:
+            if not self._inside_obstacle(point):
+                self._add_node(point)
+
+    def _remove_obstacle(self, obstacle):
+        polygon = self.polygons.pop(obstacle)
+        self._polygon_array = None
+        for point in self.candidates.pop(obstacle):
+            self._remove_node(point)
+
+        # blocked edges crossing the removed obstacle have to be evaluated again
+        blocked_edges = self._cached_edges(True)
+        if blocked_edges:
+            crossing = shapely.intersects(polygon, shapely.linestrings(blocked_edges))
+            for (a, b), is_crossing in zip(blocked_edges, crossing):
+                if is_crossing:
+                    del self.edges[a][b]
+                    del self.edges[b][a]
+
+        # avoiding WPs of other obstacles, which were inside the removed obstacle, can be valid again
+        for candidates in self.candidates.values():
+            for point in candidates:
+                if point not in self.nodes and shapely.contains_xy(polygon, *point) and not self._inside_obstacle(point):
+                    self._add_node(point)
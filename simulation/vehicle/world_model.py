@@ -1,19 +1,158 @@
+import shapely
 from shapely import Polygon, MultiPolygon
 
-def obstacle_in_world_model(O1, O2):
+
+class WorldModel:
+    """
+    World model of a rover with a spatial index of its entries (merged obstacles).
+    A new obstacle is merged with all entries it overlaps (found in one query of a bucket grid over the bounding boxes),
+    the entries are joined union-find style: every obstacle keeps its ID, merged IDs point to the root entry, so the
+    buckets are never relabelled. The entries keep the exact outline of the union (holes filled, collinear points
+    removed). version is incremented with every change, so caches of the navigation can tell whether they are stale.
+    Iterating yields the entries as lists of corners, like the list based world model.
+    """
+    concave = True                  # entries can be concave, navigation places the avoiding WPs of reflex corners outside
+
+    def __init__(self, bucket_size=50):
+        self.bucket_size = bucket_size
+        self.version = 0
+        self._parent = []           # obstacle ID -> parent ID (union-find), root IDs identify the entries
+        self._entries = {}          # root ID -> corners of the entry [(x1, y1), (x2, y2), ...], in order of creation
+        self._polygons = {}         # root ID -> prepared Polygon of the entry
+        self._buckets = {}          # bucket (column, row) -> obstacle IDs whose bounding box covers the bucket
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, index):
+        return list(self._entries.values())[index]
+
+    def __repr__(self):
+        return f"WorldModel({list(self._entries.values())})"
+
+    def copy(self):
+        world_model = WorldModel.__new__(WorldModel)
+        world_model.__dict__.update(self.__dict__)
+        world_model._parent = list(self._parent)
+        world_model._entries = dict(self._entries)
+        world_model._polygons = dict(self._polygons)
+        world_model._buckets = {bucket: list(obstacle_ids) for bucket, obstacle_ids in self._buckets.items()}
+        return world_model
+
+    def find(self, obstacle_id):
+        parent = self._parent
+        root = obstacle_id
+        while parent[root] != root:
+            root = parent[root]
+        while parent[obstacle_id] != root:              # path compression
+            parent[obstacle_id], obstacle_id = root, parent[obstacle_id]
+        return root
+
+    def _buckets_of(self, polygon):
+        min_x, min_y, max_x, max_y = polygon.bounds
+        size = self.bucket_size
+        return [(column, row) for column in range(int(min_x // size), int(max_x // size) + 1)
+                for row in range(int(min_y // size), int(max_y // size) + 1)]
+
+    def candidates(self, polygon):
+        """
+        :return: IDs of the entries whose bounding box buckets are shared with the polygon (ascending = order of creation).
+        """
+        roots = set()
+        for bucket in self._buckets_of(polygon):
+            for obstacle_id in self._buckets.get(bucket, ()):
+                roots.add(self.find(obstacle_id))
+        return sorted(roots)
+
+    def contains(self, obstacle):
+        """
+        Checks if the obstacle is included in an entry of the world model.
+        """
+        polygon = Polygon(obstacle)
+        return any(self._polygons[root].contains(polygon) for root in self.candidates(polygon))
+
+    def add(self, obstacle):
+        """
+        Adds the obstacle and merges it with all overlapping entries (entries touching only at a corner are not merged).
+        """
+        polygon = Polygon(obstacle)
+        overlapping = [root for root in self.candidates(polygon)
+                       if self._polygons[root].intersects(polygon) and not isinstance(self._polygons[root].union(polygon), MultiPolygon)]
+        obstacle_id = len(self._parent)
+        self._parent.append(obstacle_id)
+        for bucket in self._buckets_of(polygon):
+            self._buckets.setdefault(bucket, []).append(obstacle_id)
+        if not overlapping:
+            self._entries[obstacle_id] = list(obstacle)
+            self._polygons[obstacle_id] = polygon
+        else:
+            root = overlapping[0]                       # the oldest entry keeps its place in the world model
+            merged = shapely.union_all([self._polygons[other] for other in overlapping] + [polygon])
+            corners = _drop_collinear(merged.exterior.coords[:-1])                  # holes filled
+            outline = Polygon(corners)
+            for other in overlapping[1:]:
+                del self._entries[other]
+                del self._polygons[other]
+                self._parent[other] = root
+            self._parent[obstacle_id] = root
+            self._entries[root] = corners
+            self._polygons[root] = outline
+        shapely.prepare(self._polygons[self.find(obstacle_id)])
+        self.version += 1
+
+
+def _drop_collinear(corners):
+    """
+    Removes the corners which lie on the line between their neighbours (including the start point of the ring).
+    """
+    corners = [tuple(corner) for corner in corners]
+    changed = True
+    while changed and len(corners) > 3:
+        changed = False
+        for i, (x, y) in enumerate(corners):
+            (x0, y0), (x1, y1) = corners[i - 1], corners[(i + 1) % len(corners)]
+            if (x - x0) * (y1 - y) - (y - y0) * (x1 - x) == 0:
+                del corners[i]
+                changed = True
+                break
+    return corners
+
+
+def obstacle_in_world_model(O1, O2, grid=None):
     """
     Checks if obstacle O1 is already included in obstacle O2 (world model)
+    :param grid: OccupancyGrid of the world model, if given the check is a lookup of the known cells.
     """
+    if isinstance(O2, WorldModel):
+        return O2.contains(O1)
+    if grid is not None:
+        return grid.contains(O1)
     new_polygon = Polygon(O1)
     for obstacles_in_WM in O2:
         if Polygon(obstacles_in_WM).contains(new_polygon):
             return True
     return False
 
-def world_model_update(O1, O2):
+def world_model_update(O1, O2, grid=None):
     """
     Updates (appends) the World Model O2 with the obstacle O1
+    :param grid: OccupancyGrid of the world model, if given the overlapping entry is looked up in the label grid.
     """
+    if isinstance(O2, WorldModel):
+        O2.add(O1)
+        return
+    if grid is not None:
+        i = grid.overlap_index(O1)
+        if i is None:
+            O2.append(O1)
+            i = len(O2) - 1
+        else:
+            O2[i] = merge(O1, O2[i])
+        grid.add(O1, i)
+        return
     if check_overlap(O1, O2):
         i = overlap_index(O1, O2)
         O2[i] = merge(O1, O2[i])
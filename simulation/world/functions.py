@@ -1,10 +1,12 @@
 import random
+import numpy as np
+import shapely
 from shapely.geometry import Point, Polygon
-from vehicle.navigation import avoiding_WP_generation
+from vehicle.inflated_obstacles import inflated_obstacle
 
 def generate_random_start_positions(num_positions, obstacles, WIDTH, HEIGHT, INITIAL_DISTANCE):
     start_positions = []
-    obstacle_polygons = [Polygon(avoiding_WP_generation(obstacle, INITIAL_DISTANCE)) for obstacle in obstacles]
+    obstacle_polygons = np.array([inflated_obstacle(obstacle, INITIAL_DISTANCE).polygon for obstacle in obstacles], dtype=object)     # cached, prepared
 
     while len(start_positions) < num_positions:
         # generate random coordinates
@@ -12,12 +14,7 @@ def generate_random_start_positions(num_positions, obstacles, WIDTH, HEIGHT, INI
         y = random.randint(0, HEIGHT)
         
         # check whether the generated point does not intersect an obstacle
-        point = Point(x, y)
-        inside_obstacle = False
-        for obstacle_polygon in obstacle_polygons:
-            if obstacle_polygon.intersects(point):
-                inside_obstacle = True
-                break
+        inside_obstacle = bool(shapely.intersects_xy(obstacle_polygons, x, y).any())
         
         if not inside_obstacle:
             start_positions.append((x, y))
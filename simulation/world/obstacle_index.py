@@ -0,0 +1,97 @@
+import numpy as np
+import shapely
+from shapely import STRtree
+from world.obstacle_map import OBSTACLE_MAP
+
+
+class ObstacleIndex:
+    """
+    Static spatial index over the obstacles of the world.
+    The polygons are built once from the vertex array of the obstacle map and prepared, obstacles are addressed by their
+    (stable) index in the obstacle list.
+    The geometry descriptors of the obstacles (area, centroid, bounding box, dedup fingerprint) are computed once as
+    well, distances to a target on the first request for that target.
+    """
+
+    def __init__(self, obstacle_map):
+        """
+        :param obstacle_map: ObstacleMap of the world.
+        """
+        self.obstacles = obstacle_map
+        self.polygons = obstacle_map.polygons()
+        shapely.prepare(self.polygons)
+        self.tree = STRtree(self.polygons)
+
+        # descriptors, computed on unprepared polygons (same values as Polygon(obstacle).area, .centroid, .distance())
+        self._unprepared = obstacle_map.polygons()
+        self.areas = shapely.area(self._unprepared).tolist()
+        self._centroids = shapely.centroid(self._unprepared)
+        self.centroids = shapely.get_coordinates(self._centroids).tolist()             # [x, y] per obstacle
+        self.bounds = np.asarray(obstacle_map.bounds, dtype=float).tolist()             # [min x, min y, max x, max y] per obstacle (stored in the map)
+        # integer key per group of nearly identical obstacles (rounded area and centroid), used for deduplication
+        keys = {}
+        self.fingerprints = [keys.setdefault((round(area, 3), round(x, 2), round(y, 2)), len(keys))
+                             for area, (x, y) in zip(self.areas, self.centroids)]
+        self._target_distances = {}
+        self._centroid_distances = {}
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def distances_to(self, target):
+        """
+        :param target: The coordinates (x, y) of a target.
+        :return: list with the distance of every obstacle to the target (cached per target).
+        """
+        target = tuple(target)
+        if target not in self._target_distances:
+            self._target_distances[target] = shapely.distance(self._unprepared, shapely.Point(target)).tolist()
+        return self._target_distances[target]
+
+    def centroid_distances_to(self, target):
+        """
+        :param target: The coordinates (x, y) of a target.
+        :return: list with the distance of the centroid of every obstacle to the target (cached per target).
+        """
+        target = tuple(target)
+        if target not in self._centroid_distances:
+            self._centroid_distances[target] = shapely.distance(self._centroids, shapely.Point(target)).tolist()
+        return self._centroid_distances[target]
+
+    def query_range(self, x, y, distance):
+        """
+        Returns the indices of all obstacles within the given distance of the point (x, y).
+        :param x, y: The position, i.e. of a rover.
+        :param distance: The query radius, i.e. the sensor range.
+        :return: The obstacle indices in ascending order (= order of the obstacle list).
+        """
+        indices = self.tree.query(shapely.Point(x, y), predicate="dwithin", distance=distance)
+        indices.sort()
+        return indices.tolist()
+
+    def query_range_many(self, xs, ys, distance):
+        """
+        Vectorized query_range for many positions at once.
+        :param xs, ys: Arrays with the coordinates of the positions.
+        :param distance: The query radius, i.e. the sensor range.
+        :return: Two arrays (position indices, obstacle indices) with one entry per pair within distance, sorted by position and obstacle.
+        """
+        positions, obstacles = self.tree.query(shapely.points(xs, ys), predicate="dwithin", distance=distance)
+        order = np.lexsort((obstacles, positions))
+        return positions[order], obstacles[order]
+
+    def query_segments_many(self, start_xs, start_ys, end_xs, end_ys, distance):
+        """
+        Vectorized query of the obstacles within the given distance of straight segments, i.e. the paths of rovers to their next WP.
+        :param start_xs, start_ys, end_xs, end_ys: Arrays with the coordinates of the start and end points of the segments.
+        :param distance: The query radius, i.e. the sensor range.
+        :return: Two arrays (segment indices, obstacle indices) with one entry per pair within distance, sorted by segment and obstacle.
+        """
+        coordinates = np.stack((np.column_stack((start_xs, start_ys)), np.column_stack((end_xs, end_ys))), axis=1)
+        segments, obstacles = self.tree.query(shapely.linestrings(coordinates), predicate="dwithin", distance=distance)
+        order = np.lexsort((obstacles, segments))
+        return segments[order], obstacles[order]
+
+
+# index over the static obstacles of the world, built once at import
+OBSTACLE_INDEX = ObstacleIndex(OBSTACLE_MAP)
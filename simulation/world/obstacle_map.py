@@ -0,0 +1,126 @@
+import os
+import struct
+import hashlib
+import zipfile
+import numpy as np
+import shapely
+
+MAP_FILE = os.path.join(os.path.dirname(__file__), "obstacles.npz")
+LITERAL_FILE = os.path.join(os.path.dirname(__file__), "obstacles.py")
+
+
+def _memmap_member(path, info):
+    """
+    Memory-maps an uncompressed .npy member of a .npz archive (scalars are read).
+    """
+    with open(path, "rb") as file:
+        file.seek(info.header_offset)
+        local_header = file.read(30)                                # local file header, name and extra field follow
+        name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        offset = file.tell()
+        if not shape:
+            return np.fromfile(file, dtype=dtype, count=1).reshape(())
+    if 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+
+def load_arrays(path, mmap=True):
+    """
+    :param mmap: memory-map the arrays (read-only, shared between processes), compressed members are read.
+    :return: dict name -> array of all arrays of the .npz file.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                arrays[name] = _memmap_member(path, info)
+            else:
+                with archive.open(info) as file:
+                    arrays[name] = np.lib.format.read_array(file)
+    return arrays
+
+
+class ObstacleMap:
+    """
+    Obstacles of the world as flat arrays. Binary map format (uncompressed .npz written by map_generator.write_output,
+    the arrays can be memory-mapped):
+    vertices: (number of vertices, 2) corners of all obstacles, one after the other
+    offsets: (number of obstacles + 1,) obstacle i has the corners vertices[offsets[i]:offsets[i+1]]
+    bounds: (number of obstacles, 4) bounding boxes (min x, min y, max x, max y), index data for grids and trees
+    source_hash: () sha256 of the Python literal (obstacles.py) the map was written with, see source_hash
+    """
+
+    def __init__(self, vertices, offsets, bounds=None, source_hash=None):
+        self.vertices = vertices
+        self.offsets = offsets
+        self.source_hash = source_hash
+        if bounds is None:
+            bounds = np.array([(*vertices[start:end].min(axis=0), *vertices[start:end].max(axis=0))
+                               for start, end in zip(offsets[:-1], offsets[1:])]).reshape(-1, 4)
+        self.bounds = bounds
+
+    @classmethod
+    def load(cls, path=MAP_FILE, mmap=True):
+        arrays = load_arrays(path, mmap)
+        source_hash = arrays.get("source_hash")
+        return cls(arrays["vertices"], arrays["offsets"], arrays.get("bounds"), None if source_hash is None else str(source_hash))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return [tuple(corner) for corner in self.vertices[self.offsets[index]:self.offsets[index + 1]].tolist()]
+
+    def to_list(self):
+        """
+        :return: The obstacles in the format of obstacles.py [[(x1, y1), (x2, y2), ...], ...].
+        """
+        corners = list(map(tuple, self.vertices.tolist()))
+        offsets = self.offsets.tolist()
+        return [corners[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def polygons(self):
+        """
+        :return: array of shapely polygons, built directly from the vertex array.
+        """
+        if not len(self):
+            return np.empty(0, dtype=object)
+        counts = np.diff(self.offsets)
+        rings = shapely.linearrings(np.asarray(self.vertices, dtype=float), indices=np.repeat(np.arange(len(self)), counts))
+        return shapely.polygons(rings)
+
+
+def source_hash(literal):
+    """
+    :return: sha256 of the Python literal of the obstacles (independent of the line endings), as in map_generator.
+    """
+    return hashlib.sha256(literal.replace('\r\n', '\n').encode()).hexdigest()
+
+def load_obstacles(path=MAP_FILE):
+    """
+    Loads the obstacle map. The generated Python literal (obstacles.py) is used if there is no binary map file or if the
+    binary map was not written from the current literal (hash differs, i.e. the literal was edited or regenerated
+    without the binary map), so a stale binary map never overrides it.
+    """
+    if os.path.exists(path):
+        obstacle_map = ObstacleMap.load(path)
+        if not os.path.exists(LITERAL_FILE):
+            return obstacle_map
+        with open(LITERAL_FILE, newline='') as file:
+            if obstacle_map.source_hash == source_hash(file.read()):
+                return obstacle_map
+    from world.obstacles import OBSTACLES as obstacles
+    return ObstacleMap(np.array([corner for obstacle in obstacles for corner in obstacle]).reshape(-1, 2),
+                       np.cumsum([0] + [len(obstacle) for obstacle in obstacles]))
+
+
+# obstacles of the world, memory-mapped from obstacles.npz
+OBSTACLE_MAP = load_obstacles()
+OBSTACLES = OBSTACLE_MAP.to_list()
@@ -1,6 +1,18 @@
+import os
+import json
 import random
+import hashlib
+import numpy as np
+import shapely
+from shapely import STRtree
 from shapely.geometry import Point, Polygon
-from world.obstacles import OBSTACLES
+from world.obstacle_map import OBSTACLES
+
+POSITIONS_PER_SET = 50                  # number of positions generated per set (more are added on demand)
+NUMBER_OF_SETS = 10                     # number of sets of the simulation cycles (further sets are generated on demand)
+BASE_SEED = 42                          # seed of set i is BASE_SEED + i
+BATCH_SIZE = 256                        # candidate positions tested at once
+CACHE_FOLDER = os.path.join(os.path.dirname(__file__), "start_positions_cache")
 
 def is_position_in_obstacle(x, y, obstacles):
     """Check if a position (x, y) is inside any obstacle"""
@@ -11,35 +23,111 @@ def is_position_in_obstacle(x, y, obstacles):
             return True
     return False
 
-def generate_random_start_positions(num_rovers, obstacles, width, height, min_distance_from_obstacles=15):
-    """Generate random start positions that are not in obstacles"""
+def generate_random_start_positions(num_rovers, obstacles, width, height, min_distance_from_obstacles=15, seed=None, max_attempts=None):
+    """
+    Generate random start positions that are not in obstacles.
+    Candidates are drawn in batches and tested against all obstacles at once, the positions are the same as with
+    testing one candidate after the other (rejection sampling), so the first n positions do not depend on num_rovers.
+    :param seed: seed of a private random generator, None: the global random generator is used.
+    :param max_attempts: maximal number of candidates, None: 200 per rover (10000 for 50 rovers).
+    """
+    rng = random.Random(seed) if seed is not None else random
+    max_attempts = max_attempts if max_attempts is not None else 200 * num_rovers  # Prevent infinite loops
+    tree = STRtree(shapely.polygons([list(obstacle) for obstacle in obstacles])) if obstacles else None
     positions = {}
     attempts = 0
-    max_attempts = 10000  # Prevent infinite loops
-    
-    for rover_id in range(1, num_rovers + 1):
-        position_found = False
-        while not position_found and attempts < max_attempts:
-            x = random.randint(min_distance_from_obstacles, width - min_distance_from_obstacles)
-            y = random.randint(min_distance_from_obstacles, height - min_distance_from_obstacles)
-            
-            if not is_position_in_obstacle(x, y, obstacles):
-                positions[rover_id] = (x, y)
-                position_found = True
-            attempts += 1
-        
-        if not position_found:
-            # Fallback: use a safe position if no valid position found
-            positions[rover_id] = (width // 2, height // 2)
-    
+
+    while len(positions) < num_rovers and attempts < max_attempts:
+        batch = min(BATCH_SIZE, max_attempts - attempts)
+        candidates = np.array([(rng.randint(min_distance_from_obstacles, width - min_distance_from_obstacles),
+                                rng.randint(min_distance_from_obstacles, height - min_distance_from_obstacles)) for _ in range(batch)])
+        free = np.ones(batch, dtype=bool)
+        if tree is not None:
+            inside, _ = tree.query(shapely.points(candidates), predicate="within")
+            free[inside] = False
+        for x, y in candidates[free][:num_rovers - len(positions)].tolist():
+            positions[len(positions) + 1] = (x, y)
+        attempts += batch
+
+    for rover_id in range(len(positions) + 1, num_rovers + 1):
+        # Fallback: use a safe position if no valid position found
+        positions[rover_id] = (width // 2, height // 2)
+
     return positions
 
-# Generate 10 sets with 50 positions
-# Set random seed for reproducible results
-random.seed(42)
+def map_hash(obstacles, width, height):
+    return hashlib.sha1(repr((obstacles, width, height)).encode()).hexdigest()[:16]
+
+def cached_start_positions(num_rovers, obstacles, width, height, min_distance_from_obstacles, seed, cache_folder=CACHE_FOLDER):
+    """
+    generate_random_start_positions with a disk cache, keyed by obstacle map, seed and number of positions.
+    """
+    key = f"{map_hash(obstacles, width, height)}_{min_distance_from_obstacles}_{seed}_{num_rovers}"
+    path = os.path.join(cache_folder, f"start_positions_{key}.json") if cache_folder else None
+    if path and os.path.exists(path):
+        try:
+            with open(path) as file:
+                return {int(rover_id): tuple(position) for rover_id, position in json.load(file).items()}
+        except (OSError, ValueError):
+            pass                                # damaged cache file -> generate again
+    positions = generate_random_start_positions(num_rovers, obstacles, width, height, min_distance_from_obstacles, seed)
+    if path:
+        os.makedirs(cache_folder, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(positions, file)
+        os.replace(temporary_path, path)        # atomic, parallel processes may write the same file
+    return positions
+
+
+class StartPositionSet(dict):
+    """
+    Start positions (rover ID -> (x, y)) of one set, extended in steps of POSITIONS_PER_SET if a rover ID is missing.
+    """
+
+    def __init__(self, seed, obstacles=OBSTACLES, width=600, height=600, min_distance_from_obstacles=15):
+        self.seed = seed
+        self.obstacles = obstacles
+        self.width = width
+        self.height = height
+        self.min_distance_from_obstacles = min_distance_from_obstacles
+        super().__init__()
+        self.extend(POSITIONS_PER_SET)
+
+    def extend(self, num_rovers):
+        num_rovers = -(-num_rovers // POSITIONS_PER_SET) * POSITIONS_PER_SET
+        if num_rovers > len(self):
+            self.update(cached_start_positions(num_rovers, self.obstacles, self.width, self.height, self.min_distance_from_obstacles, self.seed))
+
+    def __missing__(self, rover_id):
+        if isinstance(rover_id, int) and rover_id > len(self):
+            self.extend(rover_id)
+            return dict.__getitem__(self, rover_id)
+        raise KeyError(rover_id)
+
+
+class StartPositionSets:
+    """
+    Sets of start positions, set i (cycle i) is generated with seed BASE_SEED + i when it is used for the first time.
+    """
+
+    def __init__(self, number_of_sets=NUMBER_OF_SETS):
+        self.number_of_sets = number_of_sets
+        self.sets = {}
+
+    def __len__(self):
+        return self.number_of_sets
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.number_of_sets
+        if index not in self.sets:
+            self.sets[index] = StartPositionSet(BASE_SEED + index)
+        return self.sets[index]
+
+    def __iter__(self):
+        return (self[index] for index in range(self.number_of_sets))
+
 
-START_POSITIONS = []
-for set_num in range(10):
-    random.seed(42 + set_num)  # Different seed for each set
-    positions_50 = generate_random_start_positions(50, OBSTACLES, 600, 600, 15)
-    START_POSITIONS.append(positions_50)
+# Sets with 50 positions (more on demand), generated lazily with a different seed for each set
+START_POSITIONS = StartPositionSets()